@@ -1,22 +1,35 @@
-"""Main module that fetches and stores the exchange rate from Buenbit."""
+"""Main module that fetches and stores the exchange rates of the tracked pairs from CriptoYa."""
 
 import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from threading import BoundedSemaphore
 from typing import Any, NoReturn
 
 import requests
 import schedule
+from requests.adapters import HTTPAdapter
 
-from crypto_tracking.logging_config import configure_logger, logger
+from crypto_tracking.logging_config import RATE_LIMITED, configure_logger, logger
 from crypto_tracking.metrics_server.backend.database.database_service import DatabaseService, Engine
 from crypto_tracking.metrics_server.backend.database.database_session import DatabaseSession
 from crypto_tracking.metrics_server.backend.database.sql_models import Entry
+from crypto_tracking.metrics_server.backend.pair_model import TRACKED_PAIRS, Pair
+from crypto_tracking.metrics_server.backend.tick_buffer import TICK_BUFFER_NAME, TickRingBuffer
+from crypto_tracking.metrics_server.backend.values_model import Values
 
+MAX_FETCH_WORKERS: int = 16
 
-def poller(project_folder: Path, db_engine: Engine, polling_rate: int = 60) -> NoReturn:
+
+def poller(
+    project_folder: Path, db_engine: Engine, polling_rate: int = 60, tick_buffer: TickRingBuffer | None = None
+) -> NoReturn:
     """Poller function that fetches the exchange rate and stores it in the database."""
-    job_instance: JobWorker = JobWorker(polling_rate=polling_rate, project_folder=project_folder, db_engine=db_engine)
+    job_instance: JobWorker = JobWorker(
+        polling_rate=polling_rate, project_folder=project_folder, db_engine=db_engine, tick_buffer=tick_buffer
+    )
 
     schedule.every(polling_rate).seconds.do(job_instance.job)
 
@@ -34,50 +47,114 @@ def poller(project_folder: Path, db_engine: Engine, polling_rate: int = 60) -> N
 
 
 class JobWorker:
-    """Class that fetches the prices of the USDT from buenbit and store it in the sqlite db"""
+    """Class that fetches the prices of the tracked pairs from CriptoYa and store them in the sqlite db"""
 
-    def __init__(self, polling_rate: int, project_folder: Path, db_engine: Engine) -> None:
+    def __init__(
+        self,
+        polling_rate: int,
+        project_folder: Path,
+        db_engine: Engine,
+        pairs: Iterable[Pair] = TRACKED_PAIRS,
+        max_requests_per_host: int = 4,
+        tick_buffer: TickRingBuffer | None = None,
+    ) -> None:
         self.polling_rate: int = polling_rate
         self.project_folder: Path = project_folder
+        self.pairs: list[Pair] = list(pairs)
 
         self.database_engine: Engine = db_engine
+        # Recent ticks are also published in shared memory for the backend, the database stays the durable store
+        self.tick_buffer: TickRingBuffer | None = tick_buffer
+
+        # Pairs are fetched concurrently, but each host only gets a bounded number of requests in flight
+        self.host_limits: dict[str, BoundedSemaphore] = {
+            pair.host: BoundedSemaphore(max_requests_per_host) for pair in self.pairs
+        }
+        self.http_session: requests.Session = requests.Session()
+        self.http_session.mount("https://", HTTPAdapter(pool_maxsize=max_requests_per_host))
+        self.executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max(1, min(len(self.pairs), MAX_FETCH_WORKERS)), thread_name_prefix="poller"
+        )
 
     def job(
         self,
     ) -> None:
-        """Fetch the exchange rate and store it in the database."""
-        logger.info("Fetching exchange rate...")
-        rate_data: dict[str, Any] = self._fetch_exchange_rate(polling_rate=self.polling_rate)
-        if rate_data:
-            buy = float(rate_data["totalAsk"])
-            sell = float(rate_data["totalBid"])
-
-            source: str = "buenbit"
-            current_time: datetime = datetime.now()
-            self.store(current_time=current_time, source=source, buy=buy, sell=sell)
-
-            logger.info("Stored new buy: %s at %s", rate_data["totalAsk"], current_time)
-            logger.info("Stored new sell: %s at %s", rate_data["totalBid"], current_time)
+        """Fetch the exchange rates of every pair and store them in the database."""
+        logger.debug("Fetching exchange rates for %s pairs...", len(self.pairs), extra=RATE_LIMITED)
+        current_time: datetime = datetime.now()
+
+        futures: dict[Future, Pair] = {
+            self.executor.submit(self._fetch_exchange_rate, pair): pair for pair in self.pairs
+        }
+
+        values: list[Values] = []
+        for future in as_completed(futures):
+            pair: Pair = futures[future]
+            try:
+                rates: dict[str, Any] = future.result()
+            except requests.RequestException as exc:
+                logger.error("Failed to fetch %s: %s", pair.name, exc)
+                continue
+
+            # A malformed payload only loses the ticks of its own pair
+            try:
+                values.extend(self._build_values(pair=pair, rates=rates, current_time=current_time))
+            except (AttributeError, KeyError, TypeError, ValueError) as exc:
+                logger.error("Malformed rates for %s: %s", pair.name, exc)
+
+        if values:
+            self.store(values=values)
+            logger.info("Stored %s entries at %s", len(values), current_time, extra=RATE_LIMITED)
 
     @staticmethod
-    def _fetch_exchange_rate(polling_rate: int) -> dict[str, Any]:
-        """Fetch the latest exchange rate from the API."""
-        url = "https://criptoya.com/api/usdt/ars"
-        timeout: int = int(polling_rate * 0.8)  # 80% of the polling rate
-        response = requests.get(url, timeout=timeout)
+    def _build_values(pair: Pair, rates: dict[str, Any], current_time: datetime) -> list[Values]:
+        """Build one value per configured source of the pair."""
+        values: list[Values] = []
+        for source in pair.sources:
+            rate_data: dict[str, Any] = rates.get(source, {})
+            if not rate_data:
+                logger.warning("No %s data found for %s", pair.name, source)
+                continue
+
+            try:
+                values.append(
+                    Values(
+                        timestamp=current_time,
+                        pair=pair.name,
+                        source=source,
+                        buy=float(rate_data["totalAsk"]),
+                        sell=float(rate_data["totalBid"]),
+                    )
+                )
+            except (KeyError, TypeError, ValueError) as exc:
+                logger.error("Malformed %s data for %s: %s", pair.name, source, exc)
+        return values
+
+    def _fetch_exchange_rate(self, pair: Pair) -> dict[str, Any]:
+        """Fetch the latest exchange rates of a pair from the API."""
+        timeout: int = int(self.polling_rate * 0.8)  # 80% of the polling rate
+        with self.host_limits[pair.host]:
+            response = self.http_session.get(pair.url, timeout=timeout)
         response.raise_for_status()
-        data = response.json()
+        return response.json()
 
-        return data.get("buenbit", {})
+    def store(self, values: list[Values]) -> None:
+        """Store the exchange rates somewhere."""
+        self._insert_entries_in_database(values=values)
 
-    def store(self, source: str, buy: float, sell: float, current_time: datetime) -> None:
-        """Store the exchange rate somewhere."""
-        self._insert_entry_in_database(current_time=current_time, source=source, buy=buy, sell=sell)
+        # Only published once they are durable, so readers never see ticks missing from the database
+        if self.tick_buffer is not None:
+            self.tick_buffer.append_many(values)
 
-    def _insert_entry_in_database(self, current_time: datetime, source: str, buy: float, sell: float) -> None:
-        """Insert the fetched exchange rate into a database."""
+    def _insert_entries_in_database(self, values: list[Values]) -> None:
+        """Insert the fetched exchange rates into the database in a single transaction."""
         with DatabaseSession(engine=self.database_engine) as db_service:
-            db_service.add(Entry(datetime=current_time, source=source, buy=buy, sell=sell))
+            for value in values:
+                db_service.add(
+                    Entry(
+                        datetime=value.timestamp, pair=value.pair, source=value.source, buy=value.buy, sell=value.sell
+                    )
+                )
 
 
 def main() -> None:
@@ -88,8 +165,9 @@ def main() -> None:
     configure_logger(project_folder=project_folder)
 
     db_engine: Engine = DatabaseService(project_folder=project_folder).start()
+    tick_buffer: TickRingBuffer = TickRingBuffer.create(project_folder / TICK_BUFFER_NAME)
     polling_rate: int = 60
-    poller(project_folder=project_folder, db_engine=db_engine, polling_rate=polling_rate)
+    poller(project_folder=project_folder, db_engine=db_engine, polling_rate=polling_rate, tick_buffer=tick_buffer)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,159 @@
+"""Command that detects gaps in the stored history and fills them from an archive or a local dump."""
+
+import argparse
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from crypto_tracking.logging_config import configure_logger, logger
+from crypto_tracking.metrics_server.backend.database.database_service import DatabaseService
+from crypto_tracking.metrics_server.backend.database.sql_models import Entry
+from crypto_tracking.metrics_server.backend.gap_detector import Gap, GapDetector
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR, TRACKED_PAIRS
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+
+class BackfillSourceAbs(ABC):
+    """Base class for the sources used to fill the gaps of the history."""
+
+    @abstractmethod
+    def fetch(self, gap: Gap) -> list[Values]:
+        """Get the values of the pair and source of the gap that fall inside it"""
+
+
+class DumpFileSource(BackfillSourceAbs):
+    """
+    Backfill source reading a local CSV or JSON dump.
+
+    The dump has the timestamp, source, buy and sell columns of exchange_rates.csv and an optional pair column.
+    """
+
+    def __init__(self, dump_file: Path) -> None:
+        match dump_file.suffix:
+            case ".csv":
+                dump = pd.read_csv(dump_file)
+            case ".json":
+                dump = pd.read_json(dump_file, orient="records", convert_dates=False)
+            case _:
+                raise ValueError(f"Unsupported dump format: {dump_file.suffix}")
+
+        if "pair" not in dump:
+            dump["pair"] = DEFAULT_PAIR.name
+        dump["timestamp"] = pd.to_datetime(dump["timestamp"])
+
+        # Each gap only looks up the rows of its own pair and source with a binary search
+        self.dumps: dict[tuple[str, str], pd.DataFrame] = {
+            (str(pair).upper(), str(source)): rows.sort_values("timestamp").reset_index(drop=True)
+            for (pair, source), rows in dump.groupby(["pair", "source"])
+        }
+
+    def fetch(self, gap: Gap) -> list[Values]:
+        rows: pd.DataFrame | None = self.dumps.get((gap.pair, gap.source))
+        if rows is None:
+            return []
+
+        first: int = int(rows["timestamp"].searchsorted(gap.start, side="right"))
+        last: int = int(rows["timestamp"].searchsorted(gap.end, side="left"))
+        return [
+            Values(
+                timestamp=row.timestamp.to_pydatetime(), source=gap.source, buy=row.buy, sell=row.sell, pair=gap.pair
+            )
+            for row in rows.iloc[first:last].itertuples()
+        ]
+
+
+class Backfiller:
+    """Fill gaps in parallel with idempotent inserts"""
+
+    def __init__(self, db_engine: Engine, backfill_source: BackfillSourceAbs, workers: int = 4) -> None:
+        self.db_engine: Engine = db_engine
+        self.backfill_source: BackfillSourceAbs = backfill_source
+        self.workers: int = workers
+
+    def backfill(self, gaps: list[Gap]) -> int:
+        """Fill the gaps and return the number of inserted entries"""
+        if not gaps:
+            return 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as executor:
+            return sum(executor.map(self._backfill_gap, gaps))
+
+    def _backfill_gap(self, gap: Gap) -> int:
+        values: list[Values] = self.backfill_source.fetch(gap)
+        if not values:
+            logger.warning("No backfill data for %s %s between %s and %s", gap.pair, gap.source, gap.start, gap.end)
+            return 0
+
+        rows: list[dict] = [
+            {
+                "pair": value.pair,
+                "source": value.source,
+                "datetime": value.timestamp,
+                "buy": value.buy,
+                "sell": value.sell,
+                "backfilled": True,
+            }
+            for value in values
+        ]
+        # Rows that already exist are left untouched, so running the backfill twice is harmless
+        statement = sqlite_insert(Entry).on_conflict_do_nothing(index_elements=["pair", "source", "datetime"])
+        with self.db_engine.begin() as connection:
+            inserted: int = connection.execute(statement, rows).rowcount
+
+        logger.info(
+            "Backfilled %s entries of %s %s between %s and %s", inserted, gap.pair, gap.source, gap.start, gap.end
+        )
+        return inserted
+
+
+def find_all_gaps(db_engine: Engine, max_interval: timedelta, until: datetime | None = None) -> list[Gap]:
+    """Find the gaps of every source of every tracked pair"""
+    gap_detector = GapDetector(db_engine=db_engine, max_interval=max_interval)
+    return [
+        gap
+        for pair in TRACKED_PAIRS
+        for source in pair.sources
+        for gap in gap_detector.find_gaps(pair=pair.name, source=source, until=until)
+    ]
+
+
+def main() -> None:
+    """Main function that detects the gaps and backfills them"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dump", type=Path, help="CSV or JSON dump used to fill the gaps")
+    parser.add_argument("--workers", type=int, default=4, help="Number of gaps filled in parallel")
+    parser.add_argument("--max-interval", type=int, default=180, help="Seconds between entries considered a gap")
+    parser.add_argument("--detect-only", action="store_true", help="Only list the gaps")
+    args = parser.parse_args()
+
+    project_folder: Path = Path(__file__).resolve().parent.parent
+    assert project_folder.name == "crypto_tracking", "Project folder is not named 'crypto_tracking'"
+
+    configure_logger(project_folder=project_folder)
+    db_engine: Engine = DatabaseService(project_folder=project_folder).start()
+
+    gaps: list[Gap] = find_all_gaps(
+        db_engine=db_engine, max_interval=timedelta(seconds=args.max_interval), until=datetime.now()
+    )
+    for gap in gaps:
+        logger.info("Gap in %s %s from %s to %s (%s)", gap.pair, gap.source, gap.start, gap.end, gap.duration)
+
+    if args.detect_only:
+        return
+
+    if args.dump is None:
+        parser.error("--dump is required to backfill")
+
+    inserted: int = Backfiller(
+        db_engine=db_engine, backfill_source=DumpFileSource(args.dump), workers=args.workers
+    ).backfill(gaps)
+    logger.info("Backfill finished: %s entries inserted in %s gaps", inserted, len(gaps))
+
+
+if __name__ == "__main__":
+    main()
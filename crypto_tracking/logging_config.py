@@ -1,8 +1,32 @@
 """Logging configuration for the project."""
 
+import atexit
+import copy
+import json
+import time
 from datetime import datetime
-from logging import DEBUG, ERROR, INFO, WARNING, Filter, Formatter, StreamHandler, getLevelName, getLogger
+from logging import (
+    DEBUG,
+    ERROR,
+    INFO,
+    WARNING,
+    Filter,
+    Formatter,
+    Handler,
+    LogRecord,
+    StreamHandler,
+    getLevelName,
+    getLogger,
+)
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
+from threading import Lock
+
+LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Passed as extra by the log calls repeated on every tick, the only ones RateLimitFilter throttles
+RATE_LIMITED: dict = {"rate_limited": True}
 
 
 def _create_log_folder_if_not_exists(folder: Path) -> Path:
@@ -17,16 +41,10 @@ def _get_log_file_using_date_in_name(log_type: str, project_folder: Path) -> Pat
     return folder / f"{date}.log"
 
 
-class LogLevelFilter(Filter):
-    def __init__(self, level) -> None:
-        self.level = level
-
-    def filter(self, record) -> bool:
-        return record.levelno == self.level
-
-
 logger = getLogger(__name__)
 
+_queue_listener: QueueListener | None = None
+
 
 class LazyFileHandler(StreamHandler):
     """
@@ -50,25 +68,135 @@ class LazyFileHandler(StreamHandler):
         self.stream = self._open_file()
         StreamHandler.emit(self, record)
 
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        StreamHandler.close(self)
+
+
+class LevelRoutingFileHandler(Handler):
+    """
+    Single handler that writes every record to the log file of its own level.
+    It replaces one level-filtered file handler per level, so each record is only looked at once.
+    """
+
+    def __init__(self, levels: list[int], project_folder: Path) -> None:
+        Handler.__init__(self)
+        self.file_handlers: dict[int, LazyFileHandler] = {
+            level: LazyFileHandler(_get_log_file_using_date_in_name(getLevelName(level), project_folder=project_folder))
+            for level in levels
+        }
+
+    def setFormatter(self, fmt: Formatter | None) -> None:
+        Handler.setFormatter(self, fmt)
+        for file_handler in self.file_handlers.values():
+            file_handler.setFormatter(fmt)
+
+    def emit(self, record: LogRecord) -> None:
+        file_handler: LazyFileHandler | None = self.file_handlers.get(record.levelno)
+        if file_handler is not None:
+            file_handler.emit(record)
+
+    def close(self) -> None:
+        for file_handler in self.file_handlers.values():
+            file_handler.close()
+        Handler.close(self)
+
+
+class JsonFormatter(Formatter):
+    """Format the records as one JSON object per line"""
+
+    def format(self, record: LogRecord) -> str:
+        log_entry: dict = {
+            "time": self.formatTime(record),
+            "logger": record.name,
+            "level": record.levelname,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            log_entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(log_entry)
+
+
+class RateLimitFilter(Filter):
+    """
+    Let through at most max_records records of the same message template per interval.
+    Only records logged with extra=RATE_LIMITED are throttled.
+    Records above max_level, e.g. warnings and errors, are never dropped.
+    The next record that passes reports how many similar records were suppressed.
+    """
+
+    def __init__(self, interval: float, max_records: int = 1, max_level: int = INFO) -> None:
+        Filter.__init__(self)
+        self.interval: float = interval
+        self.max_records: int = max_records
+        self.max_level: int = max_level
+        # Window start, records let through and records suppressed for each (logger, level, template)
+        self._windows: dict[tuple[str, int, str], list] = {}
+        self._lock: Lock = Lock()
+
+    def filter(self, record: LogRecord) -> bool:
+        if not getattr(record, "rate_limited", False) or record.levelno > self.max_level:
+            return True
+
+        key: tuple[str, int, str] = (record.name, record.levelno, str(record.msg))
+        now: float = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed: int = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} ({suppressed} similar messages suppressed)"
+                return True
+
+            if window[1] < self.max_records:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+
+class RecordQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves the formatting to the handlers of the listener.
+    QueueHandler.prepare would format the record with a plain formatter and drop its exception,
+    so the JSON output would lose its exception field.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        record = copy.copy(record)
+        # Arguments are merged now, they could change before the listener gets the record
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
-def _set_log_to_file(log_level, project_folder: Path) -> None:
-    log_type = getLevelName(log_level)
-    logfile = _get_log_file_using_date_in_name(log_type, project_folder=project_folder)
-    file_handler = LazyFileHandler(logfile)
-    file_handler.setLevel(log_level)
-    formatter = Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+def _get_file_handler(log_levels: list[int], project_folder: Path, formatter: Formatter) -> Handler:
+    file_handler = LevelRoutingFileHandler(levels=log_levels, project_folder=project_folder)
+    file_handler.setLevel(min(log_levels))
     file_handler.setFormatter(formatter)
-    level_filter = LogLevelFilter(log_level)
-    file_handler.addFilter(level_filter)
-    logger.addHandler(file_handler)
+    return file_handler
 
 
-def _set_log_to_terminal(log_level) -> None:
+def _get_terminal_handler(log_level, formatter: Formatter) -> Handler:
     stream_handler = StreamHandler()
     stream_handler.setLevel(log_level)
-    formatter = Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    return stream_handler
+
+
+def _stop_queue_listener() -> None:
+    global _queue_listener  # pylint: disable=global-statement
+
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
 
 
 def configure_logger(
@@ -77,17 +205,47 @@ def configure_logger(
     info: bool = True,
     enable_log_to_file=True,
     enable_log_to_terminal=True,
+    json_output: bool = False,
+    rate_limit_interval: float | None = 300,
 ) -> None:
+    """
+    Configure the project logger.
+    Records are put in a queue and written by a background listener thread, so logging never blocks on disk.
+    """
+    global _queue_listener  # pylint: disable=global-statement
+
     if debug:
         logger.setLevel(DEBUG)
     elif info:
         logger.setLevel(INFO)
 
+    formatter: Formatter = JsonFormatter() if json_output else Formatter(LOG_FORMAT)
+    handlers: list[Handler] = []
+
     if enable_log_to_file:
-        _set_log_to_file(ERROR, project_folder=project_folder)
-        _set_log_to_file(WARNING, project_folder=project_folder)
-        _set_log_to_file(INFO, project_folder=project_folder)
-        _set_log_to_file(DEBUG, project_folder=project_folder)
+        handlers.append(
+            _get_file_handler([ERROR, WARNING, INFO, DEBUG], project_folder=project_folder, formatter=formatter)
+        )
 
     if enable_log_to_terminal:
-        _set_log_to_terminal(DEBUG if debug else INFO)
+        handlers.append(_get_terminal_handler(DEBUG if debug else INFO, formatter=formatter))
+
+    # Reconfiguring replaces the previous pipeline instead of duplicating the output
+    _stop_queue_listener()
+    for handler in list(logger.handlers):
+        if isinstance(handler, QueueHandler):
+            logger.removeHandler(handler)
+
+    log_queue: SimpleQueue = SimpleQueue()
+    queue_handler = RecordQueueHandler(log_queue)
+    # Repeated per-tick messages marked with RATE_LIMITED are dropped before they reach the queue
+    if rate_limit_interval is not None:
+        queue_handler.addFilter(RateLimitFilter(interval=rate_limit_interval))
+    logger.addHandler(queue_handler)
+
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+# Flush the queued records when the process exits
+atexit.register(_stop_queue_listener)
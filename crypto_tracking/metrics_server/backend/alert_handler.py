@@ -1,11 +1,14 @@
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
 from enum import Enum, auto
 
 from flask import Response, jsonify
 
 from crypto_tracking.logging_config import logger
-from crypto_tracking.metrics_server.backend import notifiers
-from crypto_tracking.metrics_server.backend.backend_main import read_latest_value
 from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR, get_tracked_pair
+from crypto_tracking.metrics_server.backend.rolling_window import RollingWindow
 from crypto_tracking.metrics_server.backend.values_model import Values
 
 
@@ -24,9 +27,25 @@ class CurrencyType(Enum):
     SELL = auto()
 
 
+class AlertRule(Enum):
+    """The kind of rule an alert evaluates"""
+
+    THRESHOLD = "threshold"
+    RATE_OF_CHANGE = "rate_of_change"
+    PERCENT_MOVE = "percent_move"
+    SMA_CROSS = "sma_cross"
+    NEW_EXTREME = "new_extreme"
+
+
 class Alert:
-    def __init__(self, currency: str, currency_type: CurrencyType, threshold: float, operator: Operators) -> None:
-        self.currency: str = currency
+    rule: AlertRule = AlertRule.THRESHOLD
+
+    def __init__(
+        self, pair: str, currency_type: CurrencyType, threshold: float, operator: Operators, source: str | None = None
+    ) -> None:
+        self.pair: str = pair
+        # Alerts are evaluated against the reference source of the pair unless told otherwise
+        self.source: str = source if source is not None else get_tracked_pair(pair).reference_source
         self.currency_type: CurrencyType = currency_type
         self.threshold: float = threshold
         self.operator: Operators = operator
@@ -44,7 +63,16 @@ class Alert:
         logger.info("No notifiers to remove")
 
     def check(self, data: Values) -> bool:
-        value: float = data.buy if self.currency_type == CurrencyType.BUY else data.sell
+        if data.source != self.source:
+            return False
+
+        return self.compare(self._get_value(data))
+
+    def _get_value(self, data: Values) -> float:
+        return data.buy if self.currency_type == CurrencyType.BUY else data.sell
+
+    def compare(self, value: float) -> bool:
+        """Compare a value against the threshold, also works element-wise on NumPy arrays for the backtester"""
         match self.operator:
             case Operators.LESS_THAN:
                 return value < self.threshold
@@ -59,37 +87,177 @@ class Alert:
             case _:
                 return False
 
-    def send_alert(self) -> None:
+    def describe(self) -> str:
+        return self.pair
+
+    def send_alert(self, data: Values) -> None:
         if not self.alert_notifiers:
             logger.error("No notifiers added to alert")
             return
 
+        current_value_float: float = self._get_value(data)
         for notifier in self.alert_notifiers:
-            current_value: Values = read_latest_value()
-
-            current_value_float: float = (
-                current_value.buy if self.currency_type == CurrencyType.BUY else current_value.sell
-            )
-
             notifier.send_alert(
-                msg=f"Alert: {self.currency} for {self.currency_type} and value is {current_value_float}"
+                msg=f"Alert: {self.describe()} for {self.currency_type} and value is {current_value_float}"
             )
             logger.info("Alert sent to %s", notifier)
 
 
+class WindowAlert(Alert, ABC):
+    """
+    Base class for alerts evaluated over a rolling time window of the stream of ticks.
+
+    A rule only fires once it has seen ticks spanning a whole window, so that e.g. a daily high is not
+    judged against the few minutes since the rule was created. Seeding it from history skips that warm-up.
+    """
+
+    rule: AlertRule
+
+    def __init__(
+        self,
+        pair: str,
+        currency_type: CurrencyType,
+        threshold: float,
+        operator: Operators,
+        window: timedelta,
+        source: str | None = None,
+    ) -> None:
+        super().__init__(pair=pair, currency_type=currency_type, threshold=threshold, operator=operator, source=source)
+        self.window: RollingWindow = RollingWindow(window)
+        # Timestamp of the first tick the rule has seen, seeded or live
+        self.started_at: datetime | None = None
+
+    def check(self, data: Values) -> bool:
+        if data.source != self.source or not self._accept_tick(data.timestamp):
+            return False
+
+        fired: bool = self._check_window(timestamp=data.timestamp, value=self._get_value(data))
+        return fired and self.is_warmed_up(data.timestamp)
+
+    def seed(self, history: Iterable[Values]) -> None:
+        """Replay past ticks of the source, oldest first, to fill the window without firing"""
+        for data in history:
+            if data.source == self.source and self._accept_tick(data.timestamp):
+                self._check_window(timestamp=data.timestamp, value=self._get_value(data))
+
+    def is_warmed_up(self, timestamp: datetime) -> bool:
+        return self.started_at is not None and timestamp - self.started_at >= self.window.window
+
+    def _accept_tick(self, timestamp: datetime) -> bool:
+        """Whether the tick is newer than the window, also recording the first tick the rule sees"""
+        # The same tick can be read more than once, it must only move the window forward once
+        last_timestamp: datetime | None = self.window.last_timestamp
+        if last_timestamp is not None and timestamp <= last_timestamp:
+            return False
+
+        if self.started_at is None:
+            self.started_at = timestamp
+        return True
+
+    @abstractmethod
+    def _check_window(self, timestamp: datetime, value: float) -> bool:
+        """Push the value to the window and tell whether the rule fires"""
+
+    def describe(self) -> str:
+        return f"{self.pair} {self.rule.value} over {self.window.window}"
+
+    def select_direction(self, upwards: bool, downwards: bool) -> bool:
+        """Pick the upward signal for > and >=, the downward one for < and <=, else both. Also works on NumPy arrays"""
+        match self.operator:
+            case Operators.GREATER_THAN | Operators.GREATER_THAN_OR_EQUAL:
+                return upwards
+            case Operators.LESS_THAN | Operators.LESS_THAN_OR_EQUAL:
+                return downwards
+            case _:
+                return upwards | downwards
+
+
+class RateOfChangeAlert(WindowAlert):
+    """Compare the percent change between the oldest value of the window and the current one"""
+
+    rule = AlertRule.RATE_OF_CHANGE
+
+    def _check_window(self, timestamp: datetime, value: float) -> bool:
+        self.window.push(timestamp, value)
+        change: float = (value - self.window.oldest) / self.window.oldest * 100
+        return self.compare(change)
+
+
+class PercentMoveAlert(WindowAlert):
+    """Compare the largest percent move of the current value away from the window min or max"""
+
+    rule = AlertRule.PERCENT_MOVE
+
+    def _check_window(self, timestamp: datetime, value: float) -> bool:
+        self.window.push(timestamp, value)
+        move: float = max((value - self.window.min) / self.window.min, (self.window.max - value) / self.window.max)
+        return self.compare(move * 100)
+
+
+# The running sum of the window accumulates float rounding errors,
+# so a value equal to its moving average must not be seen as crossing it
+SMA_DIFFERENCE_DECIMALS: int = 9
+
+
+class MovingAverageCrossAlert(WindowAlert):
+    """Fire when the value crosses its simple moving average, upwards for > and downwards for <"""
+
+    rule = AlertRule.SMA_CROSS
+
+    def __init__(
+        self,
+        pair: str,
+        currency_type: CurrencyType,
+        threshold: float,
+        operator: Operators,
+        window: timedelta,
+        source: str | None = None,
+    ) -> None:
+        super().__init__(
+            pair=pair, currency_type=currency_type, threshold=threshold, operator=operator, window=window, source=source
+        )
+        self.previous_difference: float | None = None
+
+    def _check_window(self, timestamp: datetime, value: float) -> bool:
+        self.window.push(timestamp, value)
+        difference: float = round(value - self.window.mean, SMA_DIFFERENCE_DECIMALS)
+        previous_difference: float | None = self.previous_difference
+        self.previous_difference = difference
+        if previous_difference is None:
+            return False
+
+        crossed_up: bool = previous_difference <= 0 < difference
+        crossed_down: bool = previous_difference >= 0 > difference
+        return self.select_direction(crossed_up, crossed_down)
+
+
+class NewExtremeAlert(WindowAlert):
+    """Fire when the value makes a new high (>) or a new low (<) over the window"""
+
+    rule = AlertRule.NEW_EXTREME
+
+    def _check_window(self, timestamp: datetime, value: float) -> bool:
+        has_history: bool = len(self.window) > 0
+        is_new_high: bool = has_history and value > self.window.max
+        is_new_low: bool = has_history and value < self.window.min
+        self.window.push(timestamp, value)
+        return self.select_direction(is_new_high, is_new_low)
+
+
 class Alerter:
     def __init__(self) -> None:
-        self.alerts: list[Alert] = []
+        # Alerts are indexed by pair so each tick is only checked against the alerts of its own pair
+        self.alerts: dict[str, list[Alert]] = {}
 
     def check_alerts(self, data: Values) -> None:
-        for alert in self.alerts:
+        for alert in self.alerts.get(data.pair, []):
             if alert.check(data):
-                alert.send_alert()
+                alert.send_alert(data)
 
     def add_alert(self, alert: Alert, notifiers: list[NotifierAbs]) -> None:
         for notifier in notifiers:
             alert.add_notifier(notifier)
-        self.alerts.append(alert)
+        self.alerts.setdefault(alert.pair, []).append(alert)
 
 
 # Initialize the alerter instance
@@ -98,10 +266,16 @@ alerter_instance = Alerter()
 
 class AlertThresholdSetter:
     def __init__(
-        self, data: dict, alerter: Alerter, currency_type: CurrencyType, notifiers_list: list[NotifierAbs]
+        self,
+        data: dict,
+        alerter: Alerter,
+        currency_type: CurrencyType,
+        notifiers_list: list[NotifierAbs],
+        pair: str = DEFAULT_PAIR.name,
     ) -> None:
         self.data = data
         self.alerter: Alerter = alerter
+        self.pair: str = pair
         self.min_num: str | None = data.get("min_num")
         self.max_num: str | None = data.get("max_num")
         self.currency_type: CurrencyType = currency_type
@@ -118,18 +292,19 @@ class AlertThresholdSetter:
 
             return jsonify(
                 {
-                    "message": f"Min alert set successfully to {self.min_num} and Max alert set successfully to {self.max_num}"
+                    "message": f"Min alert set successfully to {self.min_num} "
+                    f"and Max alert set successfully to {self.max_num} for {self.pair}"
                 }
             )
 
         if self.min_num is not None:
             self._set_minimum_threshold(self.min_num, currency_type=self.currency_type)
-            return jsonify({"message": f"Min alert set successfully to {self.min_num}"})
+            return jsonify({"message": f"Min alert set successfully to {self.min_num} for {self.pair}"})
 
         if self.max_num is not None:
             self._set_maximum_threshold(self.max_num, currency_type=self.currency_type)
 
-            return jsonify({"message": f"Max alert set successfully to {self.max_num}"})
+            return jsonify({"message": f"Max alert set successfully to {self.max_num} for {self.pair}"})
 
         raise ValueError("Invalid input")
 
@@ -138,7 +313,7 @@ class AlertThresholdSetter:
         min_num_float = float(min_num)
         self.alerter.add_alert(
             alert=Alert(
-                currency="USDT", currency_type=currency_type, threshold=min_num_float, operator=Operators.LESS_THAN
+                pair=self.pair, currency_type=currency_type, threshold=min_num_float, operator=Operators.LESS_THAN
             ),
             notifiers=self.notifiers_list,
         )
@@ -148,7 +323,115 @@ class AlertThresholdSetter:
         max_num_float = float(max_num)
         self.alerter.add_alert(
             alert=Alert(
-                currency="USDT", currency_type=currency_type, threshold=max_num_float, operator=Operators.GREATER_THAN
+                pair=self.pair, currency_type=currency_type, threshold=max_num_float, operator=Operators.GREATER_THAN
             ),
             notifiers=self.notifiers_list,
         )
+
+
+WINDOW_ALERTS: dict[AlertRule, type[WindowAlert]] = {
+    AlertRule.RATE_OF_CHANGE: RateOfChangeAlert,
+    AlertRule.PERCENT_MOVE: PercentMoveAlert,
+    AlertRule.SMA_CROSS: MovingAverageCrossAlert,
+    AlertRule.NEW_EXTREME: NewExtremeAlert,
+}
+
+DEFAULT_WINDOWS: dict[AlertRule, timedelta] = {
+    AlertRule.RATE_OF_CHANGE: timedelta(minutes=15),
+    AlertRule.PERCENT_MOVE: timedelta(minutes=15),
+    AlertRule.SMA_CROSS: timedelta(hours=1),
+    AlertRule.NEW_EXTREME: timedelta(days=1),
+}
+
+
+class AlertRuleSetter:
+    """Set a rolling window alert from the threshold, operator and window_minutes of the request"""
+
+    def __init__(
+        self,
+        data: dict,
+        alerter: Alerter,
+        currency_type: CurrencyType,
+        notifiers_list: list[NotifierAbs],
+        rule: AlertRule,
+        pair: str = DEFAULT_PAIR.name,
+        history_reader: Callable[[str, str, datetime], list[Values]] | None = None,
+    ) -> None:
+        self.data = data
+        self.alerter: Alerter = alerter
+        self.currency_type: CurrencyType = currency_type
+        self.notifiers_list: list[NotifierAbs] = notifiers_list
+        self.rule: AlertRule = rule
+        self.pair: str = pair
+        # Reads the stored ticks of a pair and source covering a window that starts at the given time
+        self.history_reader: Callable[[str, str, datetime], list[Values]] | None = history_reader
+
+    def set_alert(self) -> Response:
+        """Set the alert for the rule"""
+        try:
+            alert = build_alert(
+                data={**self.data, "rule": self.rule.value}, pair=self.pair, currency_type=self.currency_type
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)})
+
+        if self.history_reader is not None and isinstance(alert, WindowAlert):
+            alert.seed(self.history_reader(alert.pair, alert.source, datetime.now() - alert.window.window))
+
+        self.alerter.add_alert(alert=alert, notifiers=self.notifiers_list)
+        return jsonify({"message": f"{self.rule.value} alert set successfully for {alert.describe()}"})
+
+
+def build_alert(data: dict, pair: str, currency_type: CurrencyType) -> Alert:
+    """Build the alert described by the rule, threshold, operator and window_minutes of a request"""
+    try:
+        rule = AlertRule(data.get("rule", AlertRule.THRESHOLD.value))
+    except ValueError as exc:
+        raise ValueError(f"Invalid rule. Valid rules are {[rule.value for rule in AlertRule]}") from exc
+
+    needs_threshold: bool = rule in (AlertRule.THRESHOLD, AlertRule.RATE_OF_CHANGE, AlertRule.PERCENT_MOVE)
+    if needs_threshold and data.get("threshold") is None:
+        raise ValueError(f"Please provide threshold for {rule.value}")
+
+    try:
+        threshold = float(data.get("threshold", 0))
+        operator = Operators(data.get("operator", Operators.GREATER_THAN.value))
+        window_minutes = float(data.get("window_minutes", DEFAULT_WINDOWS.get(rule, timedelta()).total_seconds() / 60))
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid rule parameters: {exc}") from exc
+
+    if rule == AlertRule.THRESHOLD:
+        return Alert(pair=pair, currency_type=currency_type, threshold=threshold, operator=operator)
+
+    if window_minutes <= 0:
+        raise ValueError("window_minutes must be positive")
+
+    return WINDOW_ALERTS[rule](
+        pair=pair,
+        currency_type=currency_type,
+        threshold=threshold,
+        operator=operator,
+        window=timedelta(minutes=window_minutes),
+    )
+
+
+def build_alerts(data: dict, pair: str, currency_type: CurrencyType) -> list[Alert]:
+    """
+    Build the alerts of a rule like build_alert, also accepting the min_num and max_num of a threshold request.
+    They become a "<" and a ">" threshold alert, as AlertThresholdSetter sets them.
+    """
+    bounds: dict[Operators, object] = {
+        Operators.LESS_THAN: data.get("min_num"),
+        Operators.GREATER_THAN: data.get("max_num"),
+    }
+    is_threshold: bool = data.get("rule", AlertRule.THRESHOLD.value) == AlertRule.THRESHOLD.value
+    if not is_threshold or data.get("threshold") is not None or all(bound is None for bound in bounds.values()):
+        return [build_alert(data=data, pair=pair, currency_type=currency_type)]
+
+    return [
+        build_alert(
+            data={**data, "threshold": bound, "operator": operator.value}, pair=pair, currency_type=currency_type
+        )
+        for operator, bound in bounds.items()
+        if bound is not None
+    ]
@@ -1,4 +1,5 @@
 import time
+from datetime import datetime
 from pathlib import Path
 from threading import Thread
 from typing import NoReturn
@@ -6,39 +7,161 @@ from typing import NoReturn
 from flask import Flask, Response, jsonify, request
 from sqlalchemy import Engine, text
 
-from crypto_tracking.logging_config import logger
-from crypto_tracking.metrics_server.backend.alert_handler import AlertThresholdSetter, CurrencyType, alerter_instance
+from crypto_tracking.logging_config import RATE_LIMITED, logger
+from crypto_tracking.metrics_server.backend.alert_handler import (
+    AlertRule,
+    AlertRuleSetter,
+    AlertThresholdSetter,
+    Alerter,
+    CurrencyType,
+    alerter_instance,
+    build_alerts,
+)
+from crypto_tracking.metrics_server.backend.backtester import Backtester, BacktestResult, iter_history_chunks
 from crypto_tracking.metrics_server.backend.database.database_service import DatabaseService
 from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
-from crypto_tracking.metrics_server.backend.notifiers.telegram_notifier import TelegramNotifier
+from crypto_tracking.metrics_server.backend.notifiers.registry import notifier_registry, register_notifiers_from_env
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR, TRACKED_PAIRS, Pair, get_tracked_pair
+from crypto_tracking.metrics_server.backend.spread_detector import (
+    SpreadDetector,
+    SpreadSnapshot,
+    spread_detector_instance,
+)
+from crypto_tracking.metrics_server.backend.statistics_generator import GetMinMaxValues, IntervalTypes
+from crypto_tracking.metrics_server.backend.tick_buffer import TICK_BUFFER_NAME, TickRingBuffer
 from crypto_tracking.metrics_server.backend.values_model import Values
 
 app = Flask(__name__)
 
+# Streaming stages fed with every new tick of every source
+TICK_OPERATORS: list[Alerter | SpreadDetector] = [alerter_instance, spread_detector_instance]
+
 
 def _get_db_engine():
     return app.config["DB_ENGINE"]
 
 
-def read_latest_value() -> Values:
-    """Read the latest value from the database"""
+def _get_tick_buffer() -> TickRingBuffer | None:
+    """Get the tick buffer shared by the poller, opening it lazily once the poller created it"""
+    tick_buffer: TickRingBuffer | None = app.config.get("TICK_BUFFER")
+    if tick_buffer is not None and tick_buffer.is_stale():
+        tick_buffer = None
+
+    tick_buffer_path: Path | None = app.config.get("TICK_BUFFER_PATH")
+    if tick_buffer is None and tick_buffer_path is not None:
+        tick_buffer = TickRingBuffer.open(tick_buffer_path)
+
+    app.config["TICK_BUFFER"] = tick_buffer
+    return tick_buffer
+
+
+def read_latest_value(pair: str = DEFAULT_PAIR.name, source: str | None = None) -> Values:
+    """Read the latest value of a pair from the tick buffer, or from the database as fallback"""
+    if source is None:
+        source = get_tracked_pair(pair).reference_source
+
+    tick_buffer: TickRingBuffer | None = _get_tick_buffer()
+    if tick_buffer is not None and (value := tick_buffer.latest(pair=pair, source=source)) is not None:
+        return value
+
     db_engine = _get_db_engine()
     with db_engine.connect() as connection:
-        results = connection.execute(text("SELECT * FROM entries ORDER BY datetime DESC LIMIT 1"))
+        results = connection.execute(
+            text(
+                "SELECT datetime, source, buy, sell FROM entries "
+                "WHERE pair = :pair AND source = :source ORDER BY datetime DESC LIMIT 1"
+            ),
+            {"pair": pair, "source": source},
+        )
         for row in results:
             timestamp, source, buy, sell = row
-            return Values(timestamp=timestamp, source=source, buy=buy, sell=sell)
+            return Values(timestamp=timestamp, source=source, buy=buy, sell=sell, pair=pair)
+
+    raise ValueError(f"No values found in the database for {pair}")
+
 
-    raise ValueError("No values found in the database")
+def read_latest_values(pair: str) -> list[Values]:
+    """Read the latest value of every source of a pair from the tick buffer, or from the database as fallback"""
+    tick_buffer: TickRingBuffer | None = _get_tick_buffer()
+    if tick_buffer is not None:
+        values: list[Values] = tick_buffer.latest_by_source(pair=pair, sources=get_tracked_pair(pair).sources)
+        if values:
+            return values
+
+    db_engine = _get_db_engine()
+    with db_engine.connect() as connection:
+        # SQLite returns the bare columns of the row holding MAX(datetime) for each source
+        results = connection.execute(
+            text("SELECT MAX(datetime), source, buy, sell FROM entries WHERE pair = :pair GROUP BY source"),
+            {"pair": pair},
+        )
+        return [
+            Values(timestamp=timestamp, source=source, buy=buy, sell=sell, pair=pair)
+            for timestamp, source, buy, sell in results
+        ]
+
+
+def read_history(pair: str, source: str, start: datetime) -> list[Values]:
+    """
+    Read the stored ticks of a pair and source since start, oldest first.
+    The last tick before start is included, so the ticks span the whole interval when the history reaches back.
+    """
+    with _get_db_engine().connect() as connection:
+        results = connection.execute(
+            text(
+                "SELECT datetime, buy, sell FROM entries "
+                "WHERE pair = :pair AND source = :source AND datetime >= COALESCE("
+                "(SELECT MAX(datetime) FROM entries WHERE pair = :pair AND source = :source AND datetime <= :start), "
+                ":start) ORDER BY datetime"
+            ),
+            # Same format as the stored datetimes, which SQLite compares as strings
+            {"pair": pair, "source": source, "start": start.isoformat(sep=" ", timespec="microseconds")},
+        )
+        return [
+            Values(timestamp=timestamp, source=source, buy=buy, sell=sell, pair=pair)
+            for timestamp, buy, sell in results
+        ]
 
 
 @app.route("/metrics", methods=["GET"])
 def get_current_price() -> Response:
     """Get the current price of the cryptocurrency"""
-    current_value: Values = read_latest_value()
+    pair: str = request.args.get("pair", DEFAULT_PAIR.name).upper()
+    try:
+        current_value: Values = read_latest_value(pair=pair)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)})
     return jsonify(f"data: {current_value}")
 
 
+@app.route("/api/spread", methods=["GET"])
+def get_spread() -> Response:
+    """Get the latest best bid, best ask and arbitrage status of a pair"""
+    pair: str = request.args.get("pair", DEFAULT_PAIR.name).upper()
+    snapshot: SpreadSnapshot | None = spread_detector_instance.snapshots.get(pair)
+    if snapshot is None:
+        return jsonify({"error": f"No spread computed yet for {pair}"})
+    return jsonify(snapshot.model_dump(mode="json"))
+
+
+@app.route("/api/statistics", methods=["GET"])
+def get_statistics() -> Response:
+    """Get the min and max sell values of a pair over the daily, weekly, two weeks and monthly intervals"""
+    pair: str = request.args.get("pair", DEFAULT_PAIR.name).upper()
+    try:
+        tracked_pair: Pair = get_tracked_pair(pair)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)})
+
+    # The shortest intervals are usually still covered by the tick buffer and skip the database
+    min_max_getter = GetMinMaxValues(db_engine=_get_db_engine(), pair=tracked_pair, tick_buffer=_get_tick_buffer())
+    statistics: dict[str, dict[str, float | None]] = {}
+    for interval_type in IntervalTypes:
+        min_value, max_value = min_max_getter.get_min_max(interval_type)
+        statistics[interval_type.name.lower()] = {"min": min_value, "max": max_value}
+    return jsonify({"pair": pair, **statistics})
+
+
 # Define a route to handle the numbers
 @app.route("/api/numbers", methods=["POST"])
 def set_alert_thresholds() -> Response:
@@ -62,15 +185,94 @@ def set_alert_thresholds() -> Response:
         case _:
             return jsonify({"error": "Invalid currency_type"})
 
-    # Use telegram notifiers as default
-    notifiers: list[NotifierAbs] = [TelegramNotifier()]
+    pair: str = str(data.get("pair", DEFAULT_PAIR.name)).upper()
+    try:
+        get_tracked_pair(pair)
+    except ValueError:
+        return jsonify({"error": f"Invalid pair. Tracked pairs are {[tracked.name for tracked in TRACKED_PAIRS]}"})
+
+    try:
+        rule = AlertRule(data.get("rule", AlertRule.THRESHOLD.value))
+    except ValueError:
+        return jsonify({"error": f"Invalid rule. Valid rules are {[rule.value for rule in AlertRule]}"})
+
+    # Use every registered channel unless the request picks some of them
+    channels = data.get("notifiers", notifier_registry.names)
+    if not isinstance(channels, list) or not all(isinstance(channel, str) for channel in channels):
+        return jsonify({"error": "notifiers must be a list of notifier names"})
+
+    try:
+        notifiers: list[NotifierAbs] = list(notifier_registry.get_many(channels))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)})
+
+    if not notifiers:
+        return jsonify({"error": "No notifiers available"})
+
+    if rule != AlertRule.THRESHOLD:
+        return AlertRuleSetter(
+            data=data,
+            currency_type=currency_type,
+            alerter=alerter_instance,
+            notifiers_list=notifiers,
+            rule=rule,
+            pair=pair,
+            history_reader=read_history,
+        ).set_alert()
+
     return AlertThresholdSetter(
-        data=data, currency_type=currency_type, alerter=alerter_instance, notifiers_list=notifiers
+        data=data, currency_type=currency_type, alerter=alerter_instance, notifiers_list=notifiers, pair=pair
     ).set_alert()
 
 
-def run_backend(db_engine: Engine) -> None:
+@app.route("/api/backtest", methods=["POST"])
+def backtest_rules() -> Response:
+    """Replay the stored history of a pair through candidate rules and report when they would have fired"""
+    data: dict | None = request.get_json()
+    if data is None:
+        return jsonify({"error": "No data provided"})
+
+    match data.get("currency_type"):
+        case "buy":
+            currency_type = CurrencyType.BUY
+        case "sell":
+            currency_type = CurrencyType.SELL
+        case _:
+            return jsonify({"error": "Invalid currency_type"})
+
+    pair: str = str(data.get("pair", DEFAULT_PAIR.name)).upper()
+    try:
+        source: str = get_tracked_pair(pair).reference_source
+    except ValueError:
+        return jsonify({"error": f"Invalid pair. Tracked pairs are {[tracked.name for tracked in TRACKED_PAIRS]}"})
+
+    rules: list[dict] = data.get("rules", [])
+    if not rules:
+        return jsonify({"error": "Please provide rules"})
+    if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+        return jsonify({"error": "rules must be a list of rule objects"})
+
+    try:
+        alerts = [alert for rule in rules for alert in build_alerts(data=rule, pair=pair, currency_type=currency_type)]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)})
+
+    max_fired_at = data.get("max_fired_at", 100)
+    if not isinstance(max_fired_at, int) or isinstance(max_fired_at, bool) or max_fired_at < 0:
+        return jsonify({"error": "max_fired_at must be a non-negative integer"})
+
+    results: list[BacktestResult] = Backtester(alerts=alerts, max_fired_at=max_fired_at).run(
+        iter_history_chunks(_get_db_engine(), pair=pair, source=source)
+    )
+    return jsonify({"results": [result.model_dump(mode="json") for result in results]})
+
+
+def run_backend(db_engine: Engine, tick_buffer_path: Path | None = None) -> None:
     app.config["DB_ENGINE"] = db_engine
+    app.config["TICK_BUFFER_PATH"] = tick_buffer_path
+    register_notifiers_from_env(notifier_registry)
+    for notifier in notifier_registry.get_many(notifier_registry.names):
+        spread_detector_instance.add_notifier(notifier)
 
     check_alerts_thread = Thread(target=check_alerts)
     check_alerts_thread.start()
@@ -83,9 +285,11 @@ def check_alerts() -> NoReturn:
 
     time.sleep(1)
     while True:
-        logger.info("Checking for alerts")
-        value: Values = read_latest_value()
-        alerter_instance.check_alerts(data=value)
+        logger.info("Checking for alerts", extra=RATE_LIMITED)
+        for pair in TRACKED_PAIRS:
+            for value in read_latest_values(pair=pair.name):
+                for tick_operator in TICK_OPERATORS:
+                    tick_operator.check_alerts(data=value)
         time.sleep(60)
 
 
@@ -94,7 +298,7 @@ def main() -> None:
     assert project_folder.name == "crypto_tracking", "Project folder is not named 'crypto_tracking'"
 
     db_engine = DatabaseService(project_folder=project_folder).start()
-    run_backend(db_engine=db_engine)
+    run_backend(db_engine=db_engine, tick_buffer_path=project_folder / TICK_BUFFER_NAME)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,380 @@
+"""Replay the stored history through alert rules to see how often and when they would have fired."""
+
+import argparse
+import json
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from functools import cached_property
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from sqlalchemy import Engine, text
+
+from crypto_tracking.logging_config import configure_logger
+from crypto_tracking.metrics_server.backend.alert_handler import (
+    SMA_DIFFERENCE_DECIMALS,
+    Alert,
+    AlertRule,
+    CurrencyType,
+    WindowAlert,
+    build_alert,
+    build_alerts,
+)
+from crypto_tracking.metrics_server.backend.database.database_service import DatabaseService
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR, get_tracked_pair
+
+CHUNK_SIZE: int = 100_000
+
+# Timestamps, buy values and sell values of consecutive ticks
+HistoryChunk = tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+class BacktestResult(BaseModel):
+    """How often and when a rule would have fired over the replayed history"""
+
+    rule: str
+    operator: str
+    threshold: float
+    window_minutes: float | None
+    fire_count: int
+    first_fired: datetime | None
+    last_fired: datetime | None
+    fired_at: list[datetime]
+
+
+class _ChunkStatistics:
+    """
+    Rolling window statistics of every tick of a chunk, computed with NumPy for all ticks at once.
+
+    Statistics are cached by window, so candidate rules that only differ by threshold or operator share them.
+    """
+
+    def __init__(self, timestamps: np.ndarray, values: np.ndarray) -> None:
+        self.timestamps: np.ndarray = timestamps
+        self.values: np.ndarray = values
+        self.indexes: np.ndarray = np.arange(len(values))
+        self._cache: dict[tuple[str, timedelta], np.ndarray] = {}
+
+    def _cached(self, name: str, window: timedelta, compute) -> np.ndarray:
+        if (name, window) not in self._cache:
+            self._cache[(name, window)] = compute(window)
+        return self._cache[(name, window)]
+
+    def window_starts(self, window: timedelta) -> np.ndarray:
+        """Index of the oldest tick still in the window of every tick, same eviction rule as RollingWindow"""
+        return self._cached(
+            "starts",
+            window,
+            lambda window: np.searchsorted(self.timestamps, self.timestamps - np.timedelta64(window), side="right"),
+        )
+
+    def window_oldest(self, window: timedelta) -> np.ndarray:
+        return self._cached("oldest", window, lambda window: self.values[self.window_starts(window)])
+
+    def window_min(self, window: timedelta) -> np.ndarray:
+        return self._cached("min", window, lambda window: self._range_query(self._sparse_tables[0], np.minimum, window))
+
+    def window_max(self, window: timedelta) -> np.ndarray:
+        return self._cached("max", window, lambda window: self._range_query(self._sparse_tables[1], np.maximum, window))
+
+    def window_mean(self, window: timedelta) -> np.ndarray:
+        def compute(window: timedelta) -> np.ndarray:
+            starts: np.ndarray = self.window_starts(window)
+            sums: np.ndarray = self._prefix_sums[self.indexes + 1] - self._prefix_sums[starts]
+            return sums / (self.indexes + 1 - starts) + self.values[0]
+
+        return self._cached("mean", window, compute)
+
+    @cached_property
+    def _prefix_sums(self) -> np.ndarray:
+        # Summing the distance to the first value keeps the sums small and precise
+        return np.concatenate(([0.0], np.cumsum(self.values - self.values[0])))
+
+    @cached_property
+    def _sparse_tables(self) -> tuple[list[np.ndarray], list[np.ndarray]]:
+        """Minimum and maximum of every range of 2^k values, so any range is covered by two of them"""
+        minimums: list[np.ndarray] = [self.values]
+        maximums: list[np.ndarray] = [self.values]
+        span: int = 1
+        while 2 * span <= len(self.values):
+            minimums.append(np.minimum(minimums[-1][:-span], minimums[-1][span:]))
+            maximums.append(np.maximum(maximums[-1][:-span], maximums[-1][span:]))
+            span *= 2
+        return minimums, maximums
+
+    def _range_query(self, tables: list[np.ndarray], reduce, window: timedelta) -> np.ndarray:
+        starts: np.ndarray = self.window_starts(window)
+        levels: np.ndarray = np.log2(self.indexes - starts + 1).astype(int)
+        result: np.ndarray = np.empty(len(starts))
+        for level in np.unique(levels):
+            selected: np.ndarray = levels == level
+            table: np.ndarray = tables[level]
+            result[selected] = reduce(table[starts[selected]], table[self.indexes[selected] - (1 << level) + 1])
+        return result
+
+
+def _evaluate(alert: Alert, statistics: _ChunkStatistics) -> np.ndarray:
+    """
+    Evaluate an alert on every tick of a chunk at once.
+
+    Mirrors Alert.check and the _check_window of each WindowAlert, and reuses their compare and select_direction.
+    """
+    values: np.ndarray = statistics.values
+    if not isinstance(alert, WindowAlert):
+        return alert.compare(values)
+
+    window: timedelta = alert.window.window
+    match alert.rule:
+        case AlertRule.RATE_OF_CHANGE:
+            oldest: np.ndarray = statistics.window_oldest(window)
+            return alert.compare((values - oldest) / oldest * 100)
+
+        case AlertRule.PERCENT_MOVE:
+            minimums: np.ndarray = statistics.window_min(window)
+            maximums: np.ndarray = statistics.window_max(window)
+            return alert.compare(np.maximum((values - minimums) / minimums, (maximums - values) / maximums) * 100)
+
+        case AlertRule.SMA_CROSS:
+            differences: np.ndarray = np.round(values - statistics.window_mean(window), SMA_DIFFERENCE_DECIMALS)
+            # NaN compares as False, so the first tick never crosses like in MovingAverageCrossAlert
+            previous_differences: np.ndarray = np.concatenate(([np.nan], differences[:-1]))
+            crossed_up = (previous_differences <= 0) & (differences > 0)
+            crossed_down = (previous_differences >= 0) & (differences < 0)
+            return alert.select_direction(crossed_up, crossed_down)
+
+        case AlertRule.NEW_EXTREME:
+            # A tick is compared to the window as it was left after pushing the previous tick
+            is_new_high: np.ndarray = np.concatenate(([False], values[1:] > statistics.window_max(window)[:-1]))
+            is_new_low: np.ndarray = np.concatenate(([False], values[1:] < statistics.window_min(window)[:-1]))
+            return alert.select_direction(is_new_high, is_new_low)
+
+        case _:
+            raise ValueError(f"Rule {alert.rule} can not be backtested")
+
+
+class Backtester:
+    """
+    Evaluate many candidate alerts over a stream of history chunks in a single pass.
+
+    The ticks at the end of each chunk that are still inside the largest window are carried over
+    to the next one, so the results do not depend on the chunk size.
+    """
+
+    def __init__(self, alerts: list[Alert], max_fired_at: int = 1000) -> None:
+        self.alerts: list[Alert] = alerts
+        # Only the first fire times of each rule are kept
+        if max_fired_at < 0:
+            raise ValueError("max_fired_at must not be negative")
+        self.max_fired_at: int = max_fired_at
+        self.max_window: np.timedelta64 = np.timedelta64(
+            max((alert.window.window for alert in alerts if isinstance(alert, WindowAlert)), default=timedelta()),
+        )
+
+    def run(self, chunks: Iterable[HistoryChunk]) -> list[BacktestResult]:
+        fire_counts: list[int] = [0] * len(self.alerts)
+        fired_at: list[list[np.ndarray]] = [[] for _ in self.alerts]
+        first_fired: list[np.datetime64 | None] = [None] * len(self.alerts)
+        last_fired: list[np.datetime64 | None] = [None] * len(self.alerts)
+
+        carried: HistoryChunk | None = None
+        started_at: np.datetime64 | None = None
+        for chunk in chunks:
+            chunk = self._prepare_chunk(chunk, carried=carried)
+            if chunk is None:
+                continue
+            if started_at is None:
+                started_at = chunk[0][0]
+
+            carried_count: int = len(carried[0]) if carried is not None else 0
+            timestamps, buys, sells = (
+                (np.concatenate((previous, new)) for previous, new in zip(carried, chunk)) if carried else chunk
+            )
+            statistics: dict[CurrencyType, _ChunkStatistics] = {
+                CurrencyType.BUY: _ChunkStatistics(timestamps, buys),
+                CurrencyType.SELL: _ChunkStatistics(timestamps, sells),
+            }
+
+            for index, alert in enumerate(self.alerts):
+                fired: np.ndarray = np.broadcast_to(_evaluate(alert, statistics[alert.currency_type]), timestamps.shape)
+                if isinstance(alert, WindowAlert):
+                    # Like WindowAlert.check, nothing fires before the history spans a whole window
+                    fired = fired & (timestamps - started_at >= np.timedelta64(alert.window.window))
+                fired_timestamps: np.ndarray = timestamps[carried_count:][fired[carried_count:]]
+                if len(fired_timestamps):
+                    if first_fired[index] is None:
+                        first_fired[index] = fired_timestamps[0]
+                    fire_counts[index] += len(fired_timestamps)
+                    last_fired[index] = fired_timestamps[-1]
+                    kept: int = sum(len(timestamps) for timestamps in fired_at[index])
+                    fired_at[index].append(fired_timestamps[: max(self.max_fired_at - kept, 0)])
+
+            carry_from: int = min(
+                int(np.searchsorted(timestamps, timestamps[-1] - self.max_window, side="right")), len(timestamps) - 1
+            )
+            carried = (timestamps[carry_from:], buys[carry_from:], sells[carry_from:])
+
+        return [
+            BacktestResult(
+                rule=alert.rule.value,
+                operator=alert.operator.value,
+                threshold=alert.threshold,
+                window_minutes=(
+                    alert.window.window.total_seconds() / 60 if isinstance(alert, WindowAlert) else None
+                ),
+                fire_count=fire_counts[index],
+                first_fired=first_fired[index].item() if first_fired[index] is not None else None,
+                last_fired=last_fired[index].item() if last_fired[index] is not None else None,
+                fired_at=[timestamp.item() for timestamp in chain.from_iterable(fired_at[index])],
+            )
+            for index, alert in enumerate(self.alerts)
+        ]
+
+    @staticmethod
+    def _prepare_chunk(chunk: HistoryChunk, carried: HistoryChunk | None) -> HistoryChunk | None:
+        """Sort the chunk and drop the ticks that are not newer than the ones already replayed"""
+        timestamps, buys, sells = (np.asarray(array) for array in chunk)
+        timestamps = timestamps.astype("datetime64[us]")
+        order: np.ndarray = np.argsort(timestamps, kind="stable")
+        timestamps, buys, sells = timestamps[order], buys[order].astype(float), sells[order].astype(float)
+
+        # Like WindowAlert.check, a tick that is not newer than the previous one is ignored
+        keep: np.ndarray = np.concatenate(([True], timestamps[1:] > timestamps[:-1]))
+        if carried is not None:
+            keep &= timestamps > carried[0][-1]
+        if not keep.any():
+            return None
+        return timestamps[keep], buys[keep], sells[keep]
+
+
+def iter_history_chunks(
+    db_engine: Engine, pair: str, source: str, since: datetime = datetime.min, chunk_size: int = CHUNK_SIZE
+) -> Iterator[HistoryChunk]:
+    """Stream the stored history of a pair and source in chunks, following the primary key index"""
+    after: str = since.isoformat(sep=" ")
+    while True:
+        with db_engine.connect() as connection:
+            rows = connection.execute(
+                text(
+                    "SELECT datetime, buy, sell FROM entries "
+                    "WHERE pair = :pair AND source = :source AND datetime > :after "
+                    "ORDER BY datetime LIMIT :limit"
+                ),
+                {"pair": pair, "source": source, "after": after, "limit": chunk_size},
+            ).fetchall()
+
+        if not rows:
+            return
+
+        timestamps, buys, sells = zip(*rows)
+        yield np.array(timestamps, dtype="datetime64[us]"), np.array(buys, dtype=float), np.array(sells, dtype=float)
+
+        if len(rows) < chunk_size:
+            return
+        after = rows[-1][0]
+
+
+def iter_dump_chunks(dump_file: Path, pair: str, source: str, chunk_size: int = CHUNK_SIZE) -> Iterator[HistoryChunk]:
+    """Stream an archived CSV or JSON dump with the columns of exchange_rates.csv in chunks"""
+    match dump_file.suffix:
+        case ".csv":
+            dumps: Iterable[pd.DataFrame] = pd.read_csv(dump_file, chunksize=chunk_size)
+        case ".json":
+            dumps = [pd.read_json(dump_file, orient="records", convert_dates=False)]
+        case _:
+            raise ValueError(f"Unsupported dump format: {dump_file.suffix}")
+
+    for dump in dumps:
+        if "pair" in dump:
+            dump = dump[dump["pair"].str.upper() == pair]
+        dump = dump[dump["source"] == source]
+        if not dump.empty:
+            yield pd.to_datetime(dump["timestamp"]).to_numpy(), dump["buy"].to_numpy(), dump["sell"].to_numpy()
+
+
+def build_alert_grid(
+    rule: AlertRule,
+    operator: str,
+    thresholds: list[float],
+    windows: list[float],
+    pair: str,
+    currency_type: CurrencyType,
+) -> list[Alert]:
+    """Build every combination of thresholds and window minutes of a rule"""
+    return [
+        build_alert(
+            data={"rule": rule.value, "operator": operator, "threshold": threshold, "window_minutes": window},
+            pair=pair,
+            currency_type=currency_type,
+        )
+        for threshold in thresholds
+        for window in windows
+    ]
+
+
+def main() -> None:
+    """Main function that backtests alert rules from the command line"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pair", default=DEFAULT_PAIR.name)
+    parser.add_argument("--currency-type", choices=["buy", "sell"], default="sell")
+    parser.add_argument("--rules-file", type=Path, help="JSON list of rules with the fields of /api/backtest")
+    parser.add_argument("--rule", choices=[rule.value for rule in AlertRule], help="Rule to test on a grid")
+    parser.add_argument("--operator", default=">")
+    parser.add_argument("--thresholds", default="0", help="Comma separated thresholds of the grid")
+    parser.add_argument("--windows", default="60", help="Comma separated window minutes of the grid")
+    parser.add_argument("--dump", type=Path, help="Archived CSV or JSON dump replayed before the database")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    project_folder: Path = Path(__file__).resolve().parent.parent.parent
+    assert project_folder.name == "crypto_tracking", "Project folder is not named 'crypto_tracking'"
+
+    configure_logger(project_folder=project_folder)
+    db_engine: Engine = DatabaseService(project_folder=project_folder).start()
+
+    pair: str = get_tracked_pair(args.pair).name
+    currency_type: CurrencyType = CurrencyType.BUY if args.currency_type == "buy" else CurrencyType.SELL
+    alerts: list[Alert] = []
+    if args.rules_file is not None:
+        rules: list[dict] = json.loads(args.rules_file.read_text(encoding="utf-8"))
+        alerts.extend(
+            chain.from_iterable(build_alerts(data=rule, pair=pair, currency_type=currency_type) for rule in rules)
+        )
+    if args.rule is not None:
+        alerts.extend(
+            build_alert_grid(
+                rule=AlertRule(args.rule),
+                operator=args.operator,
+                thresholds=[float(threshold) for threshold in args.thresholds.split(",")],
+                windows=[float(window) for window in args.windows.split(",")],
+                pair=pair,
+                currency_type=currency_type,
+            )
+        )
+    if not alerts:
+        parser.error("Provide --rules-file or --rule")
+
+    source: str = get_tracked_pair(pair).reference_source
+    chunks: Iterable[HistoryChunk] = iter_history_chunks(
+        db_engine, pair=pair, source=source, chunk_size=args.chunk_size
+    )
+    if args.dump is not None:
+        chunks = chain(iter_dump_chunks(args.dump, pair=pair, source=source, chunk_size=args.chunk_size), chunks)
+
+    start: float = time.perf_counter()
+    results: list[BacktestResult] = Backtester(alerts=alerts, max_fired_at=0).run(chunks)
+    elapsed: float = time.perf_counter() - start
+
+    for result in results:
+        print(
+            f"{result.rule} {result.operator} {result.threshold} window={result.window_minutes}: "
+            f"fired {result.fire_count} times, first {result.first_fired}, last {result.last_fired}"
+        )
+    print(f"Backtested {len(alerts)} rules in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
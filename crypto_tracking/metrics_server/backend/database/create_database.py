@@ -23,7 +23,9 @@ class DatabaseFromCSVPopulator:
 
         with DatabaseSession(engine=self.db_engine) as session:
             for value in values:
-                entry = Entry(datetime=value.timestamp, source=value.source, buy=value.buy, sell=value.sell)
+                entry = Entry(
+                    datetime=value.timestamp, pair=value.pair, source=value.source, buy=value.buy, sell=value.sell
+                )
                 session.add(entry)
 
     def load_total_values(self) -> list[Values]:
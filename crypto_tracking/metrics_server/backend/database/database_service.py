@@ -1,10 +1,11 @@
 from pathlib import Path
 
-from sqlalchemy import Engine, create_engine
+from sqlalchemy import Engine, create_engine, inspect, text
 
 from crypto_tracking.logging_config import logger
 from crypto_tracking.metrics_server.backend.database.create_database import DatabaseFromCSVPopulator
-from crypto_tracking.metrics_server.backend.database.sql_models import Base
+from crypto_tracking.metrics_server.backend.database.sql_models import Base, Entry
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR
 
 DB_NAME: str = "crypto_tracking.db"
 
@@ -47,7 +48,35 @@ class DatabaseService:
         else:
             logger.info("Database already exists. Connecting to it...")
 
-        return self._create_new_engine_instance()
+        engine = self._create_new_engine_instance()
+        self._upgrade_schema(engine)
+        return engine
+
+    def _upgrade_schema(self, engine: Engine) -> None:
+        """Bring databases created by older versions up to the current schema"""
+        columns: set[str] = {column["name"] for column in inspect(engine).get_columns(Entry.__tablename__)}
+        if "pair" not in columns:
+            self._add_pair_dimension(engine)
+        elif "backfilled" not in columns:
+            logger.info("Adding backfilled column to entries table")
+            with engine.begin() as connection:
+                connection.execute(text("ALTER TABLE entries ADD COLUMN backfilled BOOLEAN NOT NULL DEFAULT 0"))
+
+    @staticmethod
+    def _add_pair_dimension(engine: Engine) -> None:
+        """Add the pair dimension to databases created before multi-pair tracking"""
+        logger.info("Upgrading entries table to multi-pair schema. Existing rows are stored as %s", DEFAULT_PAIR.name)
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE entries RENAME TO entries_legacy"))
+            Base.metadata.create_all(connection)
+            connection.execute(
+                text(
+                    "INSERT INTO entries (pair, source, datetime, buy, sell) "
+                    "SELECT :pair, source, datetime, buy, sell FROM entries_legacy"
+                ),
+                {"pair": DEFAULT_PAIR.name},
+            )
+            connection.execute(text("DROP TABLE entries_legacy"))
 
     def _create_new_engine_instance(self) -> Engine:
         """Get the database engine."""
@@ -1,6 +1,6 @@
 # Create sql model
 
-from sqlalchemy import Column, DateTime, Float, String
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, String
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -8,7 +8,14 @@ Base = declarative_base()
 
 class Entry(Base):
     __tablename__ = "entries"
+    pair = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
     datetime = Column(DateTime, primary_key=True)
-    source = Column(String, nullable=False)
     buy = Column(Float, nullable=False)
     sell = Column(Float, nullable=False)
+    # Rows inserted afterwards from an archive or a dump instead of by the poller
+    backfilled = Column(Boolean, nullable=False, default=False, server_default="0")
+
+    # Latest value and interval queries are always scoped to a pair
+    __table_args__ = (Index("ix_entries_pair_datetime", "pair", "datetime"),)
+
@@ -15,18 +15,21 @@ class EnvHelper:
             self.project_folder.name == "crypto_tracking"
         ), f"Project folder not found. Current project folder is: {self.project_folder}"
 
-    def get_env_var(self, name: str) -> str:
-        """Get the environment variable or load it from the .env file if it's not found."""
+    def get_env_var(self, name: str, default: str | None = None) -> str:
+        """Get the environment variable or load it from the .env file if it's not found, else use the default."""
         variable: str | None = os.environ.get(name)
 
         if variable is None:
             env_path: Path = self.project_folder / ".env"
             if env_path.exists():
-                env_vars = dotenv_values(".env")
+                env_vars = dotenv_values(env_path)
                 if variable := env_vars.get(name):
                     logger.info("Environment variable %s loaded from .env file", name)
                     return variable
 
+            if default is not None:
+                return default
+
             raise AssertionError(f"Environment variable {name} not found in env nor in .env file")
 
         logger.info("Environment variable %s loaded from environment", name)
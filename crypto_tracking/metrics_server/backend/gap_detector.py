@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from pydantic import BaseModel
+from sqlalchemy import Engine, text
+
+
+class Gap(BaseModel):
+    """Hole in the history of a pair and source, both ends excluded"""
+
+    pair: str
+    source: str
+    start: datetime
+    end: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+
+class GapDetector:
+    """Detect holes in the stored history, e.g. while the poller was down"""
+
+    def __init__(self, db_engine: Engine, max_interval: timedelta = timedelta(minutes=3)) -> None:
+        self.db_engine: Engine = db_engine
+        # Consecutive entries further apart than this are considered a gap
+        self.max_interval: timedelta = max_interval
+
+    def find_gaps(
+        self, pair: str, source: str, since: datetime = datetime.min, until: datetime | None = None
+    ) -> list[Gap]:
+        """
+        Find the gaps of a pair and source between since and until.
+
+        Only the datetime column of the (pair, source, datetime) primary key is read,
+        so SQLite answers the query with an index-only scan.
+        """
+        with self.db_engine.connect() as connection:
+            results = connection.execute(
+                text(
+                    "SELECT previous, datetime FROM ("
+                    "SELECT datetime, LAG(datetime) OVER (ORDER BY datetime) AS previous FROM entries "
+                    "WHERE pair = :pair AND source = :source AND datetime >= :since"
+                    ") WHERE (julianday(datetime) - julianday(previous)) * 86400 > :max_seconds"
+                ),
+                {
+                    "pair": pair,
+                    "source": source,
+                    "since": since.isoformat(sep=" "),
+                    "max_seconds": self.max_interval.total_seconds(),
+                },
+            )
+            gaps: list[Gap] = [Gap(pair=pair, source=source, start=start, end=end) for start, end in results]
+
+            if until is not None:
+                last_entry = connection.execute(
+                    text("SELECT MAX(datetime) FROM entries WHERE pair = :pair AND source = :source"),
+                    {"pair": pair, "source": source},
+                ).scalar()
+                if last_entry is not None:
+                    trailing_gap = Gap(pair=pair, source=source, start=last_entry, end=until)
+                    if trailing_gap.duration > self.max_interval:
+                        gaps.append(trailing_gap)
+
+        return gaps
@@ -1,11 +1,95 @@
-from crypto_tracking.metrics_server.backend.alert_handler import NotifierAbs
+import smtplib
+from email.message import EmailMessage
+from threading import Lock
+
+from crypto_tracking.logging_config import logger
+from crypto_tracking.metrics_server.backend.env_helper import EnvHelper
+from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
 
 
 class EmailNotifier(NotifierAbs):
-    """Class for sending email notifications"""
+    """Class for sending email notifications through a single reused SMTP connection"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        recipients: list[str],
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        timeout: int = 30,
+    ) -> None:
+        self.host: str = host
+        self.port: int = port
+        self.sender: str = sender
+        self.recipients: list[str] = recipients
+        self.username: str | None = username
+        self.password: str | None = password
+        self.use_tls: bool = use_tls
+        self.timeout: int = timeout
+
+        self._smtp: smtplib.SMTP | None = None
+        # smtplib connections are not thread safe
+        self._lock: Lock = Lock()
 
-    def __init__(self) -> None:
-        raise NotImplementedError("EmailNotifier is not implemented yet")
+    @classmethod
+    def from_env(cls) -> "EmailNotifier":
+        """Create the notifier from the SMTP_* and EMAIL_* environment variables"""
+        env_helper = EnvHelper()
+        username: str = env_helper.get_env_var("SMTP_USERNAME", default="")
+        password: str = env_helper.get_env_var("SMTP_PASSWORD", default="")
+        return cls(
+            host=env_helper.get_env_var("SMTP_HOST"),
+            port=int(env_helper.get_env_var("SMTP_PORT", default="587")),
+            sender=env_helper.get_env_var("EMAIL_FROM"),
+            recipients=env_helper.get_env_var("EMAIL_TO").split(","),
+            username=username or None,
+            password=password or None,
+            use_tls=env_helper.get_env_var("SMTP_USE_TLS", default="true").lower() == "true",
+        )
 
     def send_alert(self, msg: str) -> None:
-        pass
+        self.send_alerts([msg])
+
+    def send_alerts(self, msgs: list[str]) -> None:
+        """Send all the messages in a single email"""
+        if not msgs:
+            return
+
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = ", ".join(self.recipients)
+        email["Subject"] = msgs[0] if len(msgs) == 1 else f"{len(msgs)} crypto tracking alerts"
+        email.set_content("\n".join(msgs))
+
+        with self._lock:
+            try:
+                self._get_connection().send_message(email)
+            except smtplib.SMTPServerDisconnected:
+                # The server closed the idle connection, reconnect once
+                self._smtp = None
+                self._get_connection().send_message(email)
+
+        logger.info("Email with %s alerts sent to %s", len(msgs), email["To"])
+
+    def _get_connection(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                smtp.starttls()
+            if self.username is not None and self.password is not None:
+                smtp.login(self.username, self.password)
+            self._smtp = smtp
+
+        return self._smtp
+
+    def close(self) -> None:
+        with self._lock:
+            if self._smtp is not None:
+                try:
+                    self._smtp.quit()
+                except smtplib.SMTPException as exc:
+                    logger.warning("Failed to close SMTP connection: %s", exc)
+                self._smtp = None
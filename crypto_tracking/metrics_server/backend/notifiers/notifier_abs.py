@@ -7,3 +7,8 @@ class NotifierAbs(ABC):
     @abstractmethod
     def send_alert(self, msg: str) -> None:
         """Send a message to the bot"""
+
+    def send_alerts(self, msgs: list[str]) -> None:
+        """Send several messages, notifiers that can batch them override this"""
+        for msg in msgs:
+            self.send_alert(msg)
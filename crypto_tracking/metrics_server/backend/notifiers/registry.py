@@ -0,0 +1,146 @@
+import time
+from collections.abc import Callable, Iterable
+from queue import Empty, Queue
+from threading import Thread
+
+from crypto_tracking.logging_config import logger
+from crypto_tracking.metrics_server.backend.env_helper import EnvHelper
+from crypto_tracking.metrics_server.backend.notifiers.email_notifier import EmailNotifier
+from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
+from crypto_tracking.metrics_server.backend.notifiers.telegram_notifier import TelegramNotifier
+from crypto_tracking.metrics_server.backend.notifiers.webhook_notifier import WebhookNotifier
+
+
+class ChannelWorker(NotifierAbs):
+    """
+    Notifier that queues the alerts of a channel and sends them from the channel's own worker threads.
+
+    A slow or failing channel only delays its own queue. Messages that pile up while a worker is busy
+    are sent together through send_alerts, so notifiers that support it can batch them.
+    """
+
+    def __init__(
+        self, name: str, notifier: NotifierAbs, workers: int = 1, max_batch_size: int = 1, batch_interval: float = 0
+    ) -> None:
+        self.name: str = name
+        self.notifier: NotifierAbs = notifier
+        self.max_batch_size: int = max_batch_size
+        # Time to wait for more messages before sending a batch
+        self.batch_interval: float = batch_interval
+
+        self.queue: Queue[str | None] = Queue()
+        self.threads: list[Thread] = [
+            Thread(target=self._run, name=f"notifier-{name}-{index}", daemon=True) for index in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def __repr__(self) -> str:
+        return f"ChannelWorker({self.name})"
+
+    def send_alert(self, msg: str) -> None:
+        self.queue.put(msg)
+
+    def _run(self) -> None:
+        while True:
+            msg: str | None = self.queue.get()
+            if msg is None:
+                self.queue.task_done()
+                return
+
+            if self.batch_interval:
+                time.sleep(self.batch_interval)
+
+            batch: list[str] = [msg]
+            stop: bool = False
+            while len(batch) < self.max_batch_size:
+                try:
+                    next_msg: str | None = self.queue.get_nowait()
+                except Empty:
+                    break
+                if next_msg is None:
+                    self.queue.task_done()
+                    stop = True
+                    break
+                batch.append(next_msg)
+
+            try:
+                self.notifier.send_alerts(batch)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.error("Failed to send %s alerts through %s: %s", len(batch), self.name, exc)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Wait until every queued alert was handled"""
+        self.queue.join()
+
+    def stop(self) -> None:
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+
+class NotifierRegistry:
+    """Registry of the notification channels alerts can be sent to"""
+
+    def __init__(self) -> None:
+        self.channels: dict[str, ChannelWorker] = {}
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.channels)
+
+    def register(self, name: str, notifier: NotifierAbs, **channel_options) -> ChannelWorker:
+        if name in self.channels:
+            raise ValueError(f"Notifier {name} is already registered")
+
+        channel = ChannelWorker(name=name, notifier=notifier, **channel_options)
+        self.channels[name] = channel
+        logger.info("Notifier %s registered", name)
+        return channel
+
+    def get(self, name: str) -> ChannelWorker:
+        if name not in self.channels:
+            raise ValueError(f"Notifier {name} is not registered. Registered notifiers are {self.names}")
+        return self.channels[name]
+
+    def get_many(self, names: Iterable[str]) -> list[ChannelWorker]:
+        return [self.get(name) for name in names]
+
+    def stop(self) -> None:
+        for channel in self.channels.values():
+            channel.stop()
+        self.channels.clear()
+
+
+NOTIFIER_FACTORIES: dict[str, Callable[[], NotifierAbs]] = {
+    "telegram": TelegramNotifier,
+    "email": EmailNotifier.from_env,
+    "webhook": WebhookNotifier.from_env,
+}
+
+# The SMTP connection is shared so email uses a single worker that batches, webhooks can post in parallel
+CHANNEL_OPTIONS: dict[str, dict] = {
+    "telegram": {"workers": 1},
+    "email": {"workers": 1, "max_batch_size": 50, "batch_interval": 1},
+    "webhook": {"workers": 4},
+}
+
+
+def register_notifiers_from_env(registry: NotifierRegistry) -> None:
+    """Register the channels listed in ALERT_CHANNELS, telegram by default"""
+    channels: str = EnvHelper().get_env_var("ALERT_CHANNELS", default="telegram")
+    for name in (channel.strip() for channel in channels.split(",")):
+        if name not in NOTIFIER_FACTORIES:
+            raise ValueError(f"Unknown notifier {name}. Available notifiers are {list(NOTIFIER_FACTORIES)}")
+        registry.register(name, NOTIFIER_FACTORIES[name](), **CHANNEL_OPTIONS[name])
+
+
+# Initialize the notifier registry instance
+notifier_registry = NotifierRegistry()
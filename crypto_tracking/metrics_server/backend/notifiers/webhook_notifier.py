@@ -0,0 +1,35 @@
+import requests
+
+from crypto_tracking.logging_config import logger
+from crypto_tracking.metrics_server.backend.env_helper import EnvHelper
+from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
+
+
+class WebhookNotifier(NotifierAbs):
+    """Implementation of the NotifierAbs class that posts the alerts as JSON to a webhook URL."""
+
+    def __init__(self, url: str, message_key: str = "text", timeout: int = 10) -> None:
+        self.url: str = url
+        # Key holding the message in the JSON body, e.g. "text" for Slack or "content" for Discord
+        self.message_key: str = message_key
+        self.timeout: int = timeout
+        self.http_session: requests.Session = requests.Session()
+
+    @classmethod
+    def from_env(cls) -> "WebhookNotifier":
+        """Create the notifier from the WEBHOOK_* environment variables"""
+        env_helper = EnvHelper()
+        return cls(
+            url=env_helper.get_env_var("WEBHOOK_URL"),
+            message_key=env_helper.get_env_var("WEBHOOK_MESSAGE_KEY", default="text"),
+        )
+
+    def send_alert(self, msg: str) -> None:
+        """Post the alert to the webhook."""
+        try:
+            response = self.http_session.post(self.url, json={self.message_key: msg}, timeout=self.timeout)
+            response.raise_for_status()
+            logger.info("Alert sent successfully to webhook")
+
+        except requests.RequestException as e:
+            logger.error("Failed to send alert to webhook: %s", e)
@@ -0,0 +1,55 @@
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, ConfigDict
+
+CRIPTOYA_API_URL: str = "https://criptoya.com/api"
+
+
+class Pair(BaseModel):
+    """Market pair tracked from the CriptoYa API, e.g. USDT/ARS"""
+
+    model_config = ConfigDict(frozen=True)
+
+    coin: str
+    fiat: str
+    # The first source is the reference price used for alerts and statistics
+    sources: tuple[str, ...] = ("buenbit",)
+
+    @property
+    def name(self) -> str:
+        return f"{self.coin}/{self.fiat}".upper()
+
+    @property
+    def reference_source(self) -> str:
+        return self.sources[0]
+
+    @property
+    def url(self) -> str:
+        return f"{CRIPTOYA_API_URL}/{self.coin.lower()}/{self.fiat.lower()}"
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.url).netloc
+
+
+ARS_SOURCES: tuple[str, ...] = ("buenbit", "lemoncash", "ripio", "satoshitango", "belo")
+
+DEFAULT_PAIR: Pair = Pair(coin="USDT", fiat="ARS", sources=ARS_SOURCES)
+
+TRACKED_PAIRS: tuple[Pair, ...] = (
+    DEFAULT_PAIR,
+    Pair(coin="USDC", fiat="ARS", sources=ARS_SOURCES),
+    Pair(coin="DAI", fiat="ARS", sources=ARS_SOURCES),
+    Pair(coin="BTC", fiat="ARS", sources=ARS_SOURCES),
+    Pair(coin="ETH", fiat="ARS", sources=ARS_SOURCES),
+    Pair(coin="USDT", fiat="USD", sources=("binance", "kucoin", "okx")),
+)
+
+
+def get_tracked_pair(name: str) -> Pair:
+    """Get a tracked pair from its name, e.g. 'USDT/ARS'"""
+    for pair in TRACKED_PAIRS:
+        if pair.name == name.upper():
+            return pair
+
+    raise ValueError(f"Pair {name} is not tracked")
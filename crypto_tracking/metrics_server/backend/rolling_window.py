@@ -0,0 +1,68 @@
+from collections import deque
+from datetime import datetime, timedelta
+
+
+class RollingWindow:
+    """
+    Time based sliding window over a stream of values.
+
+    Min and max are kept in monotonic deques and the mean in a running sum,
+    so pushing a value and reading any statistic is amortized O(1).
+    """
+
+    def __init__(self, window: timedelta) -> None:
+        self.window: timedelta = window
+        self.values: deque[tuple[datetime, float]] = deque()
+        self.total: float = 0.0
+        # Increasing values for the min and decreasing values for the max, oldest first
+        self._min_candidates: deque[tuple[datetime, float]] = deque()
+        self._max_candidates: deque[tuple[datetime, float]] = deque()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def push(self, timestamp: datetime, value: float) -> None:
+        """Add a value to the window and evict the values that fell out of it"""
+        self.values.append((timestamp, value))
+        self.total += value
+
+        while self._min_candidates and self._min_candidates[-1][1] >= value:
+            self._min_candidates.pop()
+        self._min_candidates.append((timestamp, value))
+
+        while self._max_candidates and self._max_candidates[-1][1] <= value:
+            self._max_candidates.pop()
+        self._max_candidates.append((timestamp, value))
+
+        self._evict(older_than=timestamp - self.window)
+
+    def _evict(self, older_than: datetime) -> None:
+        while self.values and self.values[0][0] <= older_than:
+            _, value = self.values.popleft()
+            self.total -= value
+
+        while self._min_candidates and self._min_candidates[0][0] <= older_than:
+            self._min_candidates.popleft()
+
+        while self._max_candidates and self._max_candidates[0][0] <= older_than:
+            self._max_candidates.popleft()
+
+    @property
+    def last_timestamp(self) -> datetime | None:
+        return self.values[-1][0] if self.values else None
+
+    @property
+    def oldest(self) -> float:
+        return self.values[0][1]
+
+    @property
+    def min(self) -> float:
+        return self._min_candidates[0][1]
+
+    @property
+    def max(self) -> float:
+        return self._max_candidates[0][1]
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.values)
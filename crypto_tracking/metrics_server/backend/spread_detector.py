@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from pydantic import BaseModel
+
+from crypto_tracking.logging_config import logger
+from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+
+class SpreadSnapshot(BaseModel):
+    """Best bid and best ask across the sources of a pair at a given tick"""
+
+    pair: str
+    timestamp: datetime
+    best_bid: float
+    best_bid_source: str
+    best_ask: float
+    best_ask_source: str
+    spread: float
+    net_profit_rate: float
+    is_arbitrage: bool
+
+
+class SpreadDetector:
+    """
+    Streaming operator that tracks the cross-exchange spread of every pair.
+
+    It is fed the same ticks as the Alerter and only keeps the latest tick of each source,
+    so every update costs one pass over the sources of the pair and no database query.
+    """
+
+    def __init__(
+        self, fee_rate: float = 0.001, min_profit_rate: float = 0.005, max_tick_age: timedelta = timedelta(minutes=5)
+    ) -> None:
+        # Fee paid on each leg of the trade (buy on one source, sell on the other)
+        self.fee_rate: float = fee_rate
+        self.min_profit_rate: float = min_profit_rate
+        # Quotes older than this compared to the newest tick of the pair are ignored
+        self.max_tick_age: timedelta = max_tick_age
+
+        self.latest_ticks: dict[str, dict[str, Values]] = {}
+        self.snapshots: dict[str, SpreadSnapshot] = {}
+        self.alert_notifiers: list[NotifierAbs] = []
+
+    def add_notifier(self, notifier: NotifierAbs) -> None:
+        self.alert_notifiers.append(notifier)
+        logger.info("Notifier %s added to spread detector", notifier)
+
+    def check_alerts(self, data: Values) -> None:
+        """Update the state with a new tick and alert when an arbitrage window opens"""
+        ticks: dict[str, Values] = self.latest_ticks.setdefault(data.pair, {})
+        previous_tick: Values | None = ticks.get(data.source)
+        if previous_tick is not None and previous_tick.timestamp >= data.timestamp:
+            return
+
+        ticks[data.source] = data
+        snapshot: SpreadSnapshot | None = self._compute_snapshot(pair=data.pair, now=data.timestamp)
+        if snapshot is None:
+            return
+
+        previous_snapshot: SpreadSnapshot | None = self.snapshots.get(data.pair)
+        self.snapshots[data.pair] = snapshot
+
+        was_arbitrage: bool = previous_snapshot is not None and previous_snapshot.is_arbitrage
+        if snapshot.is_arbitrage and not was_arbitrage:
+            self.send_alert(snapshot)
+        elif was_arbitrage and not snapshot.is_arbitrage:
+            logger.info("Arbitrage window closed for %s", data.pair)
+
+    def _compute_snapshot(self, pair: str, now: datetime) -> SpreadSnapshot | None:
+        fresh_ticks: list[Values] = [
+            tick for tick in self.latest_ticks[pair].values() if now - tick.timestamp <= self.max_tick_age
+        ]
+        if len(fresh_ticks) < 2:
+            return None
+
+        # The bid is the price we can sell at (sell) and the ask the price we can buy at (buy)
+        best_bid_tick: Values = max(fresh_ticks, key=lambda tick: tick.sell)
+        best_ask_tick: Values = min(fresh_ticks, key=lambda tick: tick.buy)
+
+        net_profit_rate: float = (best_bid_tick.sell * (1 - self.fee_rate)) / (
+            best_ask_tick.buy * (1 + self.fee_rate)
+        ) - 1
+
+        return SpreadSnapshot(
+            pair=pair,
+            timestamp=now,
+            best_bid=best_bid_tick.sell,
+            best_bid_source=best_bid_tick.source,
+            best_ask=best_ask_tick.buy,
+            best_ask_source=best_ask_tick.source,
+            spread=best_ask_tick.buy - best_bid_tick.sell,
+            net_profit_rate=net_profit_rate,
+            is_arbitrage=best_bid_tick.source != best_ask_tick.source and net_profit_rate > self.min_profit_rate,
+        )
+
+    def send_alert(self, snapshot: SpreadSnapshot) -> None:
+        if not self.alert_notifiers:
+            logger.error("No notifiers added to spread detector")
+            return
+
+        msg: str = (
+            f"Arbitrage: {snapshot.pair} buy on {snapshot.best_ask_source} at {snapshot.best_ask} "
+            f"and sell on {snapshot.best_bid_source} at {snapshot.best_bid} "
+            f"for a net profit of {snapshot.net_profit_rate:.2%}"
+        )
+        for notifier in self.alert_notifiers:
+            notifier.send_alert(msg=msg)
+            logger.info("Arbitrage alert sent to %s", notifier)
+
+
+# Initialize the spread detector instance
+spread_detector_instance = SpreadDetector()
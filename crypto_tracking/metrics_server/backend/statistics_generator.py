@@ -5,6 +5,11 @@ from pathlib import Path
 from sqlalchemy import Engine, text
 
 from crypto_tracking.logging_config import configure_logger
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR, Pair
+from crypto_tracking.metrics_server.backend.tick_buffer import TickRingBuffer
+
+# Scanning the ring costs about a microsecond per slot, past a few hundred slots the indexed query is faster
+MAX_BUFFER_SLOTS: int = 512
 
 
 class IntervalTypes(Enum):
@@ -17,17 +22,40 @@ class IntervalTypes(Enum):
 
 
 class GetMinMaxValues:
-    def __init__(self, db_engine: Engine) -> None:
+    def __init__(
+        self,
+        db_engine: Engine,
+        pair: Pair = DEFAULT_PAIR,
+        tick_buffer: TickRingBuffer | None = None,
+        max_buffer_slots: int = MAX_BUFFER_SLOTS,
+    ) -> None:
         self.db_engine = db_engine
+        self.pair: Pair = pair
+        # Intervals covered by at most max_buffer_slots ticks of the shared buffer are computed without the database
+        self.tick_buffer: TickRingBuffer | None = tick_buffer
+        self.max_buffer_slots: int = max_buffer_slots
 
-    def _get_min_max_interval(self, interval_type: IntervalTypes) -> tuple[int, int]:
+    def get_min_max(self, interval_type: IntervalTypes) -> tuple[int, int]:
         end_date = datetime.now()
         start_date = end_date - timedelta(days=interval_type.value)
 
+        if self.tick_buffer is not None:
+            sells: list[float] | None = self.tick_buffer.sells_since(
+                pair=self.pair.name,
+                source=self.pair.reference_source,
+                start=start_date,
+                max_slots=self.max_buffer_slots,
+            )
+            if sells:
+                return min(sells), max(sells)
+
         with self.db_engine.connect() as connection:
             results = connection.execute(
-                text("SELECT MIN(sell), MAX(sell) FROM entries WHERE datetime >= :start_date"),
-                {"start_date": start_date},
+                text(
+                    "SELECT MIN(sell), MAX(sell) FROM entries "
+                    "WHERE pair = :pair AND source = :source AND datetime >= :start_date"
+                ),
+                {"pair": self.pair.name, "source": self.pair.reference_source, "start_date": start_date},
             )
             for row in results:
                 min_val, max_val = row
@@ -35,16 +63,16 @@ class GetMinMaxValues:
         raise ValueError("No values found in the database")
 
     def get_min_max_daily(self) -> tuple[int, int]:
-        return self._get_min_max_interval(IntervalTypes.DAILY)
+        return self.get_min_max(IntervalTypes.DAILY)
 
     def get_min_max_weekly(self) -> tuple[int, int]:
-        return self._get_min_max_interval(IntervalTypes.WEEKLY)
+        return self.get_min_max(IntervalTypes.WEEKLY)
 
     def get_min_max_two_weeks(self) -> tuple[int, int]:
-        return self._get_min_max_interval(IntervalTypes.TWO_WEEKS)
+        return self.get_min_max(IntervalTypes.TWO_WEEKS)
 
     def get_min_max_monthly(self) -> tuple[int, int]:
-        return self._get_min_max_interval(IntervalTypes.MONTHLY)
+        return self.get_min_max(IntervalTypes.MONTHLY)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,231 @@
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from crypto_tracking.logging_config import logger
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+TICK_BUFFER_NAME: str = "ticks.ring"
+DEFAULT_CAPACITY: int = 65536
+# Latest value lookups only look back this far from the newest tick, older values are read from the database
+DEFAULT_MAX_AGE: timedelta = timedelta(minutes=5)
+
+_MAGIC: bytes = b"TICKRING"
+_VERSION: int = 1
+# magic, version, capacity, number of ticks ever written
+_HEADER = struct.Struct("<8sIIQ")
+_COUNT = struct.Struct("<Q")
+_COUNT_OFFSET: int = 16
+_HEADER_SIZE: int = 64
+# sequence, microseconds since epoch, pair, source, buy, sell
+_SLOT = struct.Struct("<Qq16s16sdd")
+_SEQUENCE = struct.Struct("<Q")
+
+_EPOCH: datetime = datetime(1970, 1, 1)
+
+
+def _to_micros(timestamp: datetime) -> int:
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+class TickRingBuffer:
+    """
+    Bounded ring buffer of the latest ticks in a memory mapped file shared between the poller and the backend.
+
+    There is a single writer (the poller). Every slot is protected by a seqlock: the writer sets the slot sequence
+    to 2n+1 while it writes tick n and to 2n+2 when done, then publishes the new tick count in the header.
+    Readers copy a slot between two reads of its sequence and only accept it if both are 2n+2, which also detects
+    slots that were overwritten by a newer lap of the ring. Ticks are appended in time order, so a time range
+    is found by bisecting the slots. The database stays the durable store.
+    """
+
+    def __init__(self, path: Path, file_descriptor: int, access: int = mmap.ACCESS_WRITE) -> None:
+        self.path: Path = path
+        try:
+            self._inode: int = os.fstat(file_descriptor).st_ino
+            self._mmap: mmap.mmap = mmap.mmap(file_descriptor, 0, access=access)
+        finally:
+            os.close(file_descriptor)
+
+        magic, version, capacity, _ = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC or version != _VERSION or len(self._mmap) != _HEADER_SIZE + capacity * _SLOT.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a tick ring buffer")
+        self.capacity: int = capacity
+
+    @classmethod
+    def create(cls, path: Path, capacity: int = DEFAULT_CAPACITY) -> "TickRingBuffer":
+        """Open the buffer for writing, creating it if it does not exist"""
+        try:
+            return cls(path=path, file_descriptor=os.open(path, os.O_RDWR))
+        except (FileNotFoundError, ValueError):
+            pass
+
+        # Build the file aside and swap it in, so readers never map a partially initialized file
+        temporary_path: Path = path.with_suffix(".tmp")
+        with open(temporary_path, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, _VERSION, capacity, 0).ljust(_HEADER_SIZE, b"\0"))
+            file.truncate(_HEADER_SIZE + capacity * _SLOT.size)
+        os.replace(temporary_path, path)
+        logger.info("Created tick ring buffer %s with %s slots", path, capacity)
+
+        return cls(path=path, file_descriptor=os.open(path, os.O_RDWR))
+
+    @classmethod
+    def open(cls, path: Path) -> "TickRingBuffer | None":
+        """Open an existing buffer for reading, or None if the poller did not create it yet"""
+        try:
+            return cls(path=path, file_descriptor=os.open(path, os.O_RDONLY), access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError) as exc:
+            logger.debug("Tick ring buffer not available: %s", exc)
+            return None
+
+    def is_stale(self) -> bool:
+        """Whether the file was replaced since it was mapped"""
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return True
+
+    def close(self) -> None:
+        self._mmap.close()
+
+    @property
+    def count(self) -> int:
+        return _COUNT.unpack_from(self._mmap, _COUNT_OFFSET)[0]
+
+    def append(self, value: Values) -> None:
+        self.append_many([value])
+
+    def append_many(self, values: Iterable[Values]) -> None:
+        count: int = self.count
+        for value in values:
+            offset: int = self._slot_offset(count)
+            _SEQUENCE.pack_into(self._mmap, offset, 2 * count + 1)
+            _SLOT.pack_into(
+                self._mmap,
+                offset,
+                2 * count + 1,
+                _to_micros(value.timestamp),
+                value.pair.encode(),
+                value.source.encode(),
+                value.buy,
+                value.sell,
+            )
+            _SEQUENCE.pack_into(self._mmap, offset, 2 * count + 2)
+            count += 1
+            _COUNT.pack_into(self._mmap, _COUNT_OFFSET, count)
+
+    def _slot_offset(self, index: int) -> int:
+        return _HEADER_SIZE + (index % self.capacity) * _SLOT.size
+
+    def _read_slot(self, index: int) -> tuple[int, bytes, bytes, float, float] | None:
+        """Read tick number index, or None if it was overwritten or is being written"""
+        offset: int = self._slot_offset(index)
+        expected_sequence: int = 2 * index + 2
+
+        if _SEQUENCE.unpack_from(self._mmap, offset)[0] != expected_sequence:
+            return None
+        _, micros, pair, source, buy, sell = _SLOT.unpack_from(self._mmap, offset)
+        if _SEQUENCE.unpack_from(self._mmap, offset)[0] != expected_sequence:
+            return None
+
+        return micros, pair.rstrip(b"\0"), source.rstrip(b"\0"), buy, sell
+
+    def _iter_slots(self, max_age: timedelta | None = None) -> Iterator[tuple[int, bytes, bytes, float, float]]:
+        """
+        Iterate over the raw ticks from the newest to the oldest still in the buffer.
+        With max_age, stop at the first tick older than the newest one minus max_age.
+        """
+        count: int = self.count
+        oldest_micros: int | None = None
+        for index in range(count - 1, max(count - self.capacity, 0) - 1, -1):
+            slot = self._read_slot(index)
+            if slot is None:
+                return
+            if max_age is not None:
+                if oldest_micros is None:
+                    oldest_micros = slot[0] - max_age // timedelta(microseconds=1)
+                elif slot[0] < oldest_micros:
+                    return
+            yield slot
+
+    @staticmethod
+    def _to_values(slot: tuple[int, bytes, bytes, float, float]) -> Values:
+        micros, pair, source, buy, sell = slot
+        return Values(timestamp=_from_micros(micros), source=source.decode(), buy=buy, sell=sell, pair=pair.decode())
+
+    def latest(self, pair: str, source: str, max_age: timedelta = DEFAULT_MAX_AGE) -> Values | None:
+        """Latest tick of a pair and source, or None if it is not within max_age of the newest tick"""
+        pair_key, source_key = pair.encode(), source.encode()
+        for slot in self._iter_slots(max_age=max_age):
+            if slot[1] == pair_key and slot[2] == source_key:
+                return self._to_values(slot)
+        return None
+
+    def latest_by_source(
+        self, pair: str, sources: Iterable[str], max_age: timedelta = DEFAULT_MAX_AGE
+    ) -> list[Values]:
+        """
+        Latest tick of every source of a pair, stopping as soon as all of them were found.
+        Sources without a tick within max_age of the newest one are left out.
+        """
+        pair_key: bytes = pair.encode()
+        missing: set[bytes] = {source.encode() for source in sources}
+        values: list[Values] = []
+        for slot in self._iter_slots(max_age=max_age):
+            if slot[1] == pair_key and slot[2] in missing:
+                missing.remove(slot[2])
+                values.append(self._to_values(slot))
+                if not missing:
+                    break
+        return values
+
+    def _first_index_since(self, start_micros: int, count: int) -> int | None:
+        """
+        Index of the oldest tick not older than start_micros, bisecting the ring instead of scanning it.
+        None if the buffer does not reach back to start_micros or a slot is being overwritten.
+        """
+        low: int = max(count - self.capacity, 0)
+        oldest = self._read_slot(low)
+        if oldest is None or oldest[0] >= start_micros:
+            return None
+
+        high: int = count
+        while high - low > 1:
+            middle: int = (low + high) // 2
+            slot = self._read_slot(middle)
+            if slot is None:
+                return None
+            if slot[0] < start_micros:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def sells_since(self, pair: str, source: str, start: datetime, max_slots: int | None = None) -> list[float] | None:
+        """
+        Sell values of a pair and source newer than start.
+        None if the buffer does not reach back that far or, with max_slots, the window spans more slots than that.
+        """
+        pair_key, source_key = pair.encode(), source.encode()
+        count: int = self.count
+        first_index: int | None = self._first_index_since(_to_micros(start), count)
+        if first_index is None or (max_slots is not None and count - first_index > max_slots):
+            return None
+
+        sells: list[float] = []
+        for index in range(first_index, count):
+            slot = self._read_slot(index)
+            if slot is None:
+                return None
+            if slot[1] == pair_key and slot[2] == source_key:
+                sells.append(slot[4])
+        return sells
@@ -2,6 +2,8 @@ from datetime import datetime
 
 from pydantic import BaseModel, field_validator
 
+from crypto_tracking.metrics_server.backend.pair_model import DEFAULT_PAIR
+
 
 class Values(BaseModel):
     """Values model for entries"""
@@ -10,9 +12,12 @@ class Values(BaseModel):
     source: str
     buy: float
     sell: float
+    pair: str = DEFAULT_PAIR.name
 
     # Transform custom datetime into datetime
     @field_validator("timestamp", mode="before")
     @classmethod
-    def transform(cls, raw: str) -> datetime:
+    def transform(cls, raw: str | datetime) -> datetime:
+        if isinstance(raw, datetime):
+            return raw
         return datetime.strptime(raw, "%Y-%m-%d %H:%M:%S.%f")
@@ -15,12 +15,13 @@ def set_threshold() -> str:
         min_num = request.form["min_num"]
         max_num = request.form["max_num"]
         currency_type = request.form["currency_type"]
+        pair = request.form.get("pair", "USDT/ARS")
 
         localhost_url: str = "http://localhost:5001"
         # Send the numbers to the backend server
         response = requests.post(
             localhost_url + "/api/numbers",
-            json={"min_num": min_num, "max_num": max_num, "currency_type": currency_type},
+            json={"min_num": min_num, "max_num": max_num, "currency_type": currency_type, "pair": pair},
             timeout=60,
         )
         response.raise_for_status()
@@ -0,0 +1,104 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, text
+
+from crypto_tracking.api_poller.poller import JobWorker
+from crypto_tracking.metrics_server.backend.database.sql_models import Base
+from crypto_tracking.metrics_server.backend.pair_model import Pair
+from crypto_tracking.metrics_server.backend.tick_buffer import TickRingBuffer
+
+PAIRS: list[Pair] = [
+    Pair(coin="USDT", fiat="ARS", sources=("buenbit", "ripio")),
+    Pair(coin="USDC", fiat="ARS"),
+    Pair(coin="DAI", fiat="ARS"),
+    Pair(coin="BTC", fiat="ARS"),
+]
+
+
+class FakeSession:
+    """Stand-in for requests.Session that answers every pair after a delay and records the concurrency"""
+
+    def __init__(self, payloads: dict[str, object], delay: float = 0.05) -> None:
+        self.payloads: dict[str, object] = payloads
+        self.delay: float = delay
+        self.in_flight: int = 0
+        self.max_in_flight: int = 0
+        self.lock = threading.Lock()
+
+    def get(self, url: str, timeout: int) -> MagicMock:
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+        response = MagicMock()
+        response.json.return_value = self.payloads[url]
+        return response
+
+
+class TestJobWorker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.db_engine = create_engine(f"sqlite:///{self.folder / 'test.db'}")
+        Base.metadata.create_all(self.db_engine)
+        self.tick_buffer = TickRingBuffer.create(self.folder / "ticks.ring", capacity=16)
+
+        rates = {"buenbit": {"totalAsk": 1010, "totalBid": 990}, "ripio": {"totalAsk": 1020, "totalBid": 980}}
+        self.session = FakeSession(
+            {
+                PAIRS[0].url: rates,
+                PAIRS[1].url: rates,
+                # Malformed payloads only lose the ticks of their own pair
+                PAIRS[2].url: {"buenbit": {"totalAsk": None, "totalBid": 990}},
+                PAIRS[3].url: ["unexpected"],
+            }
+        )
+        self.worker = JobWorker(
+            polling_rate=60,
+            project_folder=self.folder,
+            db_engine=self.db_engine,
+            pairs=PAIRS,
+            max_requests_per_host=2,
+            tick_buffer=self.tick_buffer,
+        )
+        self.worker.http_session = self.session
+
+    def test_job_stores_every_well_formed_pair(self):
+        self.worker.job()
+
+        with self.db_engine.connect() as connection:
+            rows = connection.execute(text("SELECT pair, source, buy, sell FROM entries ORDER BY pair, source")).all()
+
+        self.assertEqual(
+            [tuple(row) for row in rows],
+            [
+                ("USDC/ARS", "buenbit", 1010, 990),
+                ("USDT/ARS", "buenbit", 1010, 990),
+                ("USDT/ARS", "ripio", 1020, 980),
+            ],
+        )
+        self.assertEqual(self.tick_buffer.count, 3)
+
+    def test_requests_per_host_are_bounded(self):
+        self.worker.job()
+
+        # Every pair is on the same host, so they are fetched concurrently but at most two at a time
+        self.assertEqual(self.session.max_in_flight, 2)
+
+    def tearDown(self):
+        self.worker.executor.shutdown()
+        self.tick_buffer.close()
+        self.db_engine.dispose()
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
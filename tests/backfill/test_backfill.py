@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from crypto_tracking.backfill.backfill import Backfiller, DumpFileSource
+from crypto_tracking.metrics_server.backend.database.database_session import DatabaseSession
+from crypto_tracking.metrics_server.backend.database.sql_models import Base, Entry
+from crypto_tracking.metrics_server.backend.gap_detector import GapDetector
+
+
+class TestBackfill(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.db_engine = create_engine(f"sqlite:///{self.folder / 'test.db'}")
+        Base.metadata.create_all(self.db_engine)
+
+        self.start = datetime(2024, 8, 15, 12, 0)
+        self.timestamps = [self.start + timedelta(minutes=minute) for minute in range(10)]
+        with DatabaseSession(engine=self.db_engine) as session:
+            for timestamp in self.timestamps[:3] + self.timestamps[7:]:
+                session.add(Entry(datetime=timestamp, pair="USDT/ARS", source="buenbit", buy=1000, sell=990))
+
+        self.dump_file = self.folder / "dump.csv"
+        pd.DataFrame(
+            [{"timestamp": timestamp, "source": "buenbit", "buy": 1010, "sell": 980} for timestamp in self.timestamps]
+        ).to_csv(self.dump_file, index=False)
+
+    def test_find_gaps(self):
+        gaps = GapDetector(db_engine=self.db_engine).find_gaps(pair="USDT/ARS", source="buenbit")
+
+        self.assertEqual([(gap.start, gap.end) for gap in gaps], [(self.timestamps[2], self.timestamps[7])])
+
+    def test_backfill_is_idempotent(self):
+        gaps = GapDetector(db_engine=self.db_engine).find_gaps(pair="USDT/ARS", source="buenbit")
+        backfiller = Backfiller(db_engine=self.db_engine, backfill_source=DumpFileSource(self.dump_file), workers=2)
+
+        self.assertEqual(backfiller.backfill(gaps), 4)
+        self.assertEqual(backfiller.backfill(gaps), 0)
+
+        with self.db_engine.connect() as connection:
+            counts = connection.execute(text("SELECT COUNT(*), SUM(backfilled) FROM entries")).one()
+
+        self.assertEqual(tuple(counts), (10, 4))
+        self.assertEqual(GapDetector(db_engine=self.db_engine).find_gaps(pair="USDT/ARS", source="buenbit"), [])
+
+    def tearDown(self):
+        self.db_engine.dispose()
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
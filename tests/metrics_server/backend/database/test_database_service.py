@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect, text
+
+from crypto_tracking.metrics_server.backend.database.database_service import DB_NAME, DatabaseService
+
+
+class TestUpgradeSchema(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_folder = Path(self.temp_dir.name)
+        self.legacy_engine = create_engine(f"sqlite:///{self.project_folder / DB_NAME}")
+
+    def _rows(self, engine) -> list[tuple]:
+        with engine.connect() as connection:
+            return [
+                tuple(row)
+                for row in connection.execute(
+                    text("SELECT pair, source, datetime, buy, sell, backfilled FROM entries ORDER BY datetime")
+                )
+            ]
+
+    def test_single_pair_database_is_upgraded(self):
+        # Schema of the databases created before multi-pair tracking
+        with self.legacy_engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE entries (datetime DATETIME NOT NULL PRIMARY KEY, source VARCHAR NOT NULL, "
+                    "buy FLOAT NOT NULL, sell FLOAT NOT NULL)"
+                )
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO entries VALUES ('2024-08-15 12:00:00.000000', 'buenbit', 1010, 990), "
+                    "('2024-08-15 12:01:00.000000', 'buenbit', 1011, 991)"
+                )
+            )
+
+        engine = DatabaseService(project_folder=self.project_folder).start()
+
+        self.assertEqual(
+            self._rows(engine),
+            [
+                ("USDT/ARS", "buenbit", "2024-08-15 12:00:00.000000", 1010, 990, 0),
+                ("USDT/ARS", "buenbit", "2024-08-15 12:01:00.000000", 1011, 991, 0),
+            ],
+        )
+        inspector = inspect(engine)
+        self.assertEqual(inspector.get_pk_constraint("entries")["constrained_columns"], ["pair", "source", "datetime"])
+        self.assertIn("ix_entries_pair_datetime", [index["name"] for index in inspector.get_indexes("entries")])
+        self.assertNotIn("entries_legacy", inspector.get_table_names())
+
+        # Starting again leaves the upgraded database untouched
+        self.assertEqual(self._rows(DatabaseService(project_folder=self.project_folder).start()), self._rows(engine))
+        engine.dispose()
+
+    def test_backfilled_column_is_added(self):
+        with self.legacy_engine.begin() as connection:
+            connection.execute(
+                text(
+                    "CREATE TABLE entries (pair VARCHAR NOT NULL, source VARCHAR NOT NULL, datetime DATETIME NOT NULL, "
+                    "buy FLOAT NOT NULL, sell FLOAT NOT NULL, PRIMARY KEY (pair, source, datetime))"
+                )
+            )
+            connection.execute(
+                text("INSERT INTO entries VALUES ('DAI/ARS', 'buenbit', '2024-08-15 12:00:00.000000', 1010, 990)")
+            )
+
+        engine = DatabaseService(project_folder=self.project_folder).start()
+
+        self.assertEqual(self._rows(engine), [("DAI/ARS", "buenbit", "2024-08-15 12:00:00.000000", 1010, 990, 0)])
+        engine.dispose()
+
+    def tearDown(self):
+        self.legacy_engine.dispose()
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import json
+import socketserver
+import threading
+import time
+import unittest
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from crypto_tracking.metrics_server.backend.notifiers.email_notifier import EmailNotifier
+from crypto_tracking.metrics_server.backend.notifiers.notifier_abs import NotifierAbs
+from crypto_tracking.metrics_server.backend.notifiers.registry import NotifierRegistry
+from crypto_tracking.metrics_server.backend.notifiers.webhook_notifier import WebhookNotifier
+
+
+class SMTPDebugHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP server that stores the received messages"""
+
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b"220 localhost\r\n")
+        while line := self.rfile.readline():
+            command = line.strip().upper()
+            if command.startswith(b"EHLO"):
+                self.wfile.write(b"250 localhost\r\n")
+            elif command == b"DATA":
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                self.server.messages.append(message_from_bytes(data))
+                self.wfile.write(b"250 OK\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+class WebhookStubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.bodies.append(json.loads(body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SlowNotifier(NotifierAbs):
+    def __init__(self):
+        self.messages = []
+
+    def send_alert(self, msg):
+        time.sleep(0.5)
+        self.messages.append(msg)
+
+
+class RecordingNotifier(NotifierAbs):
+    def __init__(self):
+        self.batches = []
+
+    def send_alert(self, msg):
+        self.send_alerts([msg])
+
+    def send_alerts(self, msgs):
+        self.batches.append(msgs)
+
+
+class TestEmailNotifier(unittest.TestCase):
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(("localhost", 0), SMTPDebugHandler)
+        self.server.connections = 0
+        self.server.messages = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.notifier = EmailNotifier(
+            host="localhost",
+            port=self.server.server_address[1],
+            sender="tracker@localhost",
+            recipients=["me@localhost"],
+        )
+
+    def test_connection_is_reused_and_messages_are_batched(self):
+        self.notifier.send_alert("first alert")
+        self.notifier.send_alerts(["second alert", "third alert"])
+        self.notifier.close()
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 2)
+        self.assertEqual(self.server.messages[0]["Subject"], "first alert")
+        self.assertEqual(self.server.messages[1].get_payload().splitlines(), ["second alert", "third alert"])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestWebhookNotifier(unittest.TestCase):
+    def setUp(self):
+        self.server = HTTPServer(("localhost", 0), WebhookStubHandler)
+        self.server.bodies = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def test_alert_is_posted(self):
+        notifier = WebhookNotifier(url=f"http://localhost:{self.server.server_address[1]}/hook", message_key="content")
+        notifier.send_alert("an alert")
+
+        self.assertEqual(self.server.bodies, [{"content": "an alert"}])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestNotifierRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = NotifierRegistry()
+
+    def test_slow_channel_does_not_delay_others(self):
+        slow_notifier, fast_notifier = SlowNotifier(), RecordingNotifier()
+        slow_channel = self.registry.register("slow", slow_notifier)
+        fast_channel = self.registry.register("fast", fast_notifier)
+
+        start = time.monotonic()
+        for channel in self.registry.get_many(["slow", "fast"]):
+            channel.send_alert("an alert")
+        fast_channel.flush()
+
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(fast_notifier.batches, [["an alert"]])
+        slow_channel.flush()
+        self.assertEqual(slow_notifier.messages, ["an alert"])
+
+    def test_queued_alerts_are_batched(self):
+        notifier = RecordingNotifier()
+        channel = self.registry.register("batched", notifier, max_batch_size=10, batch_interval=0.2)
+        for index in range(3):
+            channel.send_alert(f"alert {index}")
+        channel.flush()
+
+        self.assertEqual(notifier.batches, [["alert 0", "alert 1", "alert 2"]])
+
+    def test_unknown_notifier(self):
+        with self.assertRaises(ValueError):
+            self.registry.get("missing")
+
+    def tearDown(self):
+        self.registry.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
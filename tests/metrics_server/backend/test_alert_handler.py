@@ -0,0 +1,107 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from crypto_tracking.metrics_server.backend.alert_handler import (
+    Alert,
+    Alerter,
+    CurrencyType,
+    MovingAverageCrossAlert,
+    NewExtremeAlert,
+    Operators,
+    PercentMoveAlert,
+    WindowAlert,
+)
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+
+class TestAlerter(unittest.TestCase):
+    def setUp(self):
+        self.notifier = MagicMock()
+        self.alerter = Alerter()
+        self.alerter.add_alert(
+            alert=Alert(pair="USDT/ARS", currency_type=CurrencyType.SELL, threshold=1000, operator=Operators.LESS_THAN),
+            notifiers=[self.notifier],
+        )
+
+    def test_alert_is_sent_for_its_pair(self):
+        data = Values(timestamp=datetime.now(), source="buenbit", buy=1010, sell=990, pair="USDT/ARS")
+        self.alerter.check_alerts(data)
+
+        self.notifier.send_alert.assert_called_once()
+
+    def test_alert_is_not_sent_for_other_pairs(self):
+        data = Values(timestamp=datetime.now(), source="buenbit", buy=1010, sell=990, pair="USDC/ARS")
+        self.alerter.check_alerts(data)
+
+        self.notifier.send_alert.assert_not_called()
+
+
+class TestWindowAlerts(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime(2024, 8, 15, 12, 0)
+
+    def _check_all(self, alert: Alert, sells: list[float]) -> list[bool]:
+        return [
+            alert.check(
+                Values(timestamp=self.start + timedelta(minutes=minute), source="buenbit", buy=0, sell=sell)
+            )
+            for minute, sell in enumerate(sells)
+        ]
+
+    def _seed(self, alert: WindowAlert, sell: float) -> None:
+        """Seed the alert with a tick one window before the start, as if the history reached back that far"""
+        alert.seed([Values(timestamp=self.start - alert.window.window, source="buenbit", buy=0, sell=sell)])
+
+    def test_percent_move_within_window(self):
+        alert = PercentMoveAlert(
+            pair="USDT/ARS",
+            currency_type=CurrencyType.SELL,
+            threshold=2,
+            operator=Operators.GREATER_THAN,
+            window=timedelta(minutes=15),
+        )
+        self._seed(alert, sell=1000)
+
+        self.assertEqual(self._check_all(alert, [1000, 1010, 1025]), [False, False, True])
+
+    def test_sma_cross_upwards(self):
+        alert = MovingAverageCrossAlert(
+            pair="USDT/ARS",
+            currency_type=CurrencyType.SELL,
+            threshold=0,
+            operator=Operators.GREATER_THAN,
+            window=timedelta(hours=1),
+        )
+        self._seed(alert, sell=1000)
+
+        self.assertEqual(self._check_all(alert, [1000, 990, 980, 1010]), [False, False, False, True])
+
+    def test_new_high_and_repeated_tick(self):
+        alert = NewExtremeAlert(
+            pair="USDT/ARS",
+            currency_type=CurrencyType.SELL,
+            threshold=0,
+            operator=Operators.GREATER_THAN,
+            window=timedelta(days=1),
+        )
+        self._seed(alert, sell=990)
+        tick = Values(timestamp=self.start, source="buenbit", buy=0, sell=1000)
+
+        self.assertEqual(self._check_all(alert, [990, 980, 995, 1000]), [False, False, True, True])
+        self.assertFalse(alert.check(tick))
+
+    def test_nothing_fires_before_a_full_window(self):
+        alert = NewExtremeAlert(
+            pair="USDT/ARS",
+            currency_type=CurrencyType.SELL,
+            threshold=0,
+            operator=Operators.GREATER_THAN,
+            window=timedelta(minutes=2),
+        )
+
+        self.assertEqual(self._check_all(alert, [990, 995, 1000, 1005]), [False, False, True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+
+from crypto_tracking.metrics_server.backend.backend_main import app, notifier_registry, read_history
+from crypto_tracking.metrics_server.backend.database.database_session import DatabaseSession
+from crypto_tracking.metrics_server.backend.database.sql_models import Base, Entry
+
+
+class TestStoredHistory(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_engine = create_engine(f"sqlite:///{Path(self.temp_dir.name) / 'test.db'}")
+        Base.metadata.create_all(self.db_engine)
+
+        self.start = datetime(2024, 8, 15, 12, 0)
+        with DatabaseSession(engine=self.db_engine) as session:
+            for minute in range(10):
+                session.add(
+                    Entry(
+                        datetime=self.start + timedelta(minutes=minute),
+                        pair="USDT/ARS",
+                        source="buenbit",
+                        buy=1000,
+                        sell=1000 + minute,
+                    )
+                )
+
+        app.config["DB_ENGINE"] = self.db_engine
+        self.client = app.test_client()
+        self.payload = {"currency_type": "sell", "rules": [{"rule": "threshold", "threshold": 1004}]}
+
+    def test_backtest(self):
+        response = self.client.post("/api/backtest", json={**self.payload, "max_fired_at": 0})
+
+        (result,) = response.json["results"]
+        self.assertEqual(result["fire_count"], 5)
+        self.assertEqual(result["fired_at"], [])
+        self.assertEqual(result["first_fired"], "2024-08-15T12:05:00")
+
+    def test_backtest_min_max_thresholds(self):
+        response = self.client.post(
+            "/api/backtest", json={"currency_type": "sell", "rules": [{"min_num": 1002, "max_num": 1007}]}
+        )
+
+        self.assertEqual(
+            [
+                (result["operator"], result["threshold"], result["fire_count"], result["first_fired"])
+                for result in response.json["results"]
+            ],
+            [("<", 1002, 2, "2024-08-15T12:00:00"), (">", 1007, 2, "2024-08-15T12:08:00")],
+        )
+
+    def test_read_history_reaches_back_to_the_tick_before_start(self):
+        for start, first_minute in (
+            (self.start + timedelta(minutes=4, seconds=30), 4),
+            (self.start + timedelta(minutes=4), 4),
+            (self.start - timedelta(hours=1), 0),
+        ):
+            with self.subTest(start=start):
+                history = read_history(pair="USDT/ARS", source="buenbit", start=start)
+
+                self.assertEqual(history[0].timestamp, self.start + timedelta(minutes=first_minute))
+                self.assertEqual(len(history), 10 - first_minute)
+
+    def test_invalid_max_fired_at(self):
+        for max_fired_at in ("many", -1, 1.5):
+            with self.subTest(max_fired_at=max_fired_at):
+                response = self.client.post("/api/backtest", json={**self.payload, "max_fired_at": max_fired_at})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("max_fired_at", response.json["error"])
+
+    def test_malformed_rules(self):
+        for rules in (
+            [{"rule": "threshold", "threshold": None}],
+            [{"rule": "threshold", "threshold": [1004]}],
+            [{"rule": "sma_cross", "window_minutes": None}],
+            ["threshold"],
+            {"rule": "threshold", "threshold": 1004},
+        ):
+            with self.subTest(rules=rules):
+                response = self.client.post("/api/backtest", json={**self.payload, "rules": rules})
+
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("error", response.json)
+
+    def tearDown(self):
+        self.db_engine.dispose()
+        self.temp_dir.cleanup()
+
+
+class TestStatisticsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_engine = create_engine(f"sqlite:///{Path(self.temp_dir.name) / 'test.db'}")
+        Base.metadata.create_all(self.db_engine)
+
+        now = datetime.now()
+        with DatabaseSession(engine=self.db_engine) as session:
+            for days, sell in ((20, 900), (3, 950), (0, 1000)):
+                session.add(
+                    Entry(datetime=now - timedelta(days=days), pair="USDT/ARS", source="buenbit", buy=0, sell=sell)
+                )
+
+        app.config["DB_ENGINE"] = self.db_engine
+        app.config["TICK_BUFFER_PATH"] = None
+        app.config["TICK_BUFFER"] = None
+        self.client = app.test_client()
+
+    def test_statistics(self):
+        response = self.client.get("/api/statistics?pair=usdt/ars")
+
+        self.assertEqual(response.json["daily"], {"min": 1000, "max": 1000})
+        self.assertEqual(response.json["weekly"], {"min": 950, "max": 1000})
+        self.assertEqual(response.json["monthly"], {"min": 900, "max": 1000})
+
+    def test_untracked_pair(self):
+        self.assertIn("error", self.client.get("/api/statistics?pair=FOO/BAR").json)
+
+    def tearDown(self):
+        self.db_engine.dispose()
+        self.temp_dir.cleanup()
+
+
+class TestNumbersEndpoint(unittest.TestCase):
+    def test_notifiers_must_be_a_list_of_names(self):
+        client = app.test_client()
+        for notifiers in ("email", ["email", 1], {"email": True}):
+            with self.subTest(notifiers=notifiers):
+                response = client.post(
+                    "/api/numbers", json={"currency_type": "sell", "max_num": 1000, "notifiers": notifiers}
+                )
+
+                self.assertEqual(response.json, {"error": "notifiers must be a list of notifier names"})
+
+    def test_malformed_rule_parameters(self):
+        client = app.test_client()
+        for parameters in ({"threshold": None}, {"threshold": [1000]}, {"window_minutes": {}}):
+            with (
+                self.subTest(parameters=parameters),
+                patch.object(notifier_registry, "get_many", return_value=[MagicMock()]),
+            ):
+                response = client.post(
+                    "/api/numbers", json={"currency_type": "sell", "rule": "sma_cross", **parameters}
+                )
+
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Invalid rule parameters", response.json["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
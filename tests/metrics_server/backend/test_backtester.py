@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import create_engine
+
+from crypto_tracking.metrics_server.backend.alert_handler import Alert, CurrencyType, build_alert
+from crypto_tracking.metrics_server.backend.backtester import Backtester, iter_history_chunks
+from crypto_tracking.metrics_server.backend.database.database_session import DatabaseSession
+from crypto_tracking.metrics_server.backend.database.sql_models import Base, Entry
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+RULES: list[dict] = [
+    {"rule": "threshold", "threshold": 1005, "operator": ">"},
+    {"rule": "threshold", "threshold": 995, "operator": "<="},
+    {"rule": "rate_of_change", "threshold": 0.5, "operator": ">", "window_minutes": 15},
+    {"rule": "rate_of_change", "threshold": -0.5, "operator": "<", "window_minutes": 30},
+    {"rule": "percent_move", "threshold": 1, "operator": ">=", "window_minutes": 20},
+    {"rule": "sma_cross", "operator": ">", "window_minutes": 60},
+    {"rule": "sma_cross", "operator": "=", "window_minutes": 10},
+    {"rule": "new_extreme", "operator": "<", "window_minutes": 45},
+    {"rule": "new_extreme", "operator": "=", "window_minutes": 5},
+]
+
+
+class TestBacktester(unittest.TestCase):
+    def setUp(self):
+        generator = np.random.default_rng(seed=42)
+        self.start = datetime(2024, 8, 15, 12, 0)
+        # Irregular ticks with polling delays and outages
+        seconds = np.cumsum(generator.choice([30, 60, 60, 60, 120, 600], size=500))
+        self.timestamps = [self.start + timedelta(seconds=int(second)) for second in seconds]
+        self.sells = (1000 + np.cumsum(generator.normal(0, 2, size=500))).round(2).tolist()
+
+    def _build_alerts(self) -> list[Alert]:
+        return [build_alert(data=rule, pair="USDT/ARS", currency_type=CurrencyType.SELL) for rule in RULES]
+
+    def _chunks(self, chunk_size: int):
+        for start in range(0, len(self.timestamps), chunk_size):
+            yield (
+                np.array(self.timestamps[start : start + chunk_size], dtype="datetime64[us]"),
+                np.zeros(len(self.sells[start : start + chunk_size])),
+                np.array(self.sells[start : start + chunk_size]),
+            )
+
+    def _replay(self, alert: Alert) -> list[datetime]:
+        return [
+            timestamp
+            for timestamp, sell in zip(self.timestamps, self.sells)
+            if alert.check(Values(timestamp=timestamp, source="buenbit", buy=0, sell=sell))
+        ]
+
+    def test_matches_alert_check_across_chunks(self):
+        expected = [self._replay(alert) for alert in self._build_alerts()]
+
+        for chunk_size in (7, 64, 1000):
+            results = Backtester(alerts=self._build_alerts()).run(self._chunks(chunk_size))
+            for rule, result, fired_at in zip(RULES, results, expected):
+                with self.subTest(chunk_size=chunk_size, rule=rule):
+                    self.assertEqual(result.fired_at, fired_at)
+                    self.assertEqual(result.fire_count, len(fired_at))
+
+    def test_fired_at_is_capped(self):
+        alert = build_alert(
+            data={"rule": "threshold", "threshold": 0}, pair="USDT/ARS", currency_type=CurrencyType.SELL
+        )
+        (result,) = Backtester(alerts=[alert], max_fired_at=3).run(self._chunks(10))
+
+        self.assertEqual(result.fire_count, len(self.timestamps))
+        self.assertEqual(len(result.fired_at), 3)
+        self.assertEqual(result.first_fired, self.timestamps[0])
+        self.assertEqual(result.last_fired, self.timestamps[-1])
+
+    def test_fire_times_without_fired_at(self):
+        alert = build_alert(
+            data={"rule": "threshold", "threshold": 0}, pair="USDT/ARS", currency_type=CurrencyType.SELL
+        )
+        (result,) = Backtester(alerts=[alert], max_fired_at=0).run(self._chunks(10))
+
+        self.assertEqual(result.fire_count, len(self.timestamps))
+        self.assertEqual(result.fired_at, [])
+        self.assertEqual(result.first_fired, self.timestamps[0])
+        self.assertEqual(result.last_fired, self.timestamps[-1])
+
+
+class TestHistoryChunks(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_engine = create_engine(f"sqlite:///{Path(self.temp_dir.name) / 'test.db'}")
+        Base.metadata.create_all(self.db_engine)
+
+        self.start = datetime(2024, 8, 15, 12, 0)
+        with DatabaseSession(engine=self.db_engine) as session:
+            for minute in range(25):
+                timestamp = self.start + timedelta(minutes=minute)
+                session.add(Entry(datetime=timestamp, pair="USDT/ARS", source="buenbit", buy=1000, sell=minute))
+                session.add(Entry(datetime=timestamp, pair="USDT/ARS", source="binance", buy=1000, sell=-1))
+
+    def test_streams_every_entry_of_the_source_once(self):
+        chunks = list(iter_history_chunks(self.db_engine, pair="USDT/ARS", source="buenbit", chunk_size=10))
+
+        self.assertEqual([len(timestamps) for timestamps, _, _ in chunks], [10, 10, 5])
+        self.assertEqual(np.concatenate([sells for _, _, sells in chunks]).tolist(), list(range(25)))
+        self.assertEqual(chunks[0][0][0].item(), self.start)
+
+    def tearDown(self):
+        self.db_engine.dispose()
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from datetime import datetime, timedelta
+
+from crypto_tracking.metrics_server.backend.rolling_window import RollingWindow
+
+
+class TestRollingWindow(unittest.TestCase):
+    def setUp(self):
+        self.window = RollingWindow(timedelta(minutes=3))
+        self.start = datetime(2024, 8, 15, 12, 0)
+
+    def _push_all(self, values):
+        for minute, value in enumerate(values):
+            self.window.push(self.start + timedelta(minutes=minute), value)
+
+    def test_statistics_inside_window(self):
+        self._push_all([5, 3, 4])
+
+        self.assertEqual((self.window.min, self.window.max, self.window.mean), (3, 5, 4))
+        self.assertEqual(self.window.oldest, 5)
+
+    def test_old_values_are_evicted(self):
+        self._push_all([5, 3, 4, 6, 7])
+
+        self.assertEqual(len(self.window), 3)
+        self.assertEqual((self.window.min, self.window.max), (4, 7))
+        self.assertAlmostEqual(self.window.mean, 17 / 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
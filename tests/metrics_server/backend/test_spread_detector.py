@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from crypto_tracking.metrics_server.backend.spread_detector import SpreadDetector
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+
+class TestSpreadDetector(unittest.TestCase):
+    def setUp(self):
+        self.notifier = MagicMock()
+        self.detector = SpreadDetector(fee_rate=0.001, min_profit_rate=0.005)
+        self.detector.add_notifier(self.notifier)
+        self.now = datetime(2024, 8, 15, 12, 0)
+
+    def _tick(self, source: str, buy: float, sell: float, minutes: int = 0) -> Values:
+        return Values(
+            timestamp=self.now + timedelta(minutes=minutes), source=source, buy=buy, sell=sell, pair="USDT/ARS"
+        )
+
+    def test_best_bid_and_ask_across_sources(self):
+        self.detector.check_alerts(self._tick("buenbit", buy=1010, sell=990))
+        self.detector.check_alerts(self._tick("ripio", buy=1005, sell=995))
+
+        snapshot = self.detector.snapshots["USDT/ARS"]
+        self.assertEqual((snapshot.best_bid, snapshot.best_bid_source), (995, "ripio"))
+        self.assertEqual((snapshot.best_ask, snapshot.best_ask_source), (1005, "ripio"))
+        self.assertFalse(snapshot.is_arbitrage)
+        self.notifier.send_alert.assert_not_called()
+
+    def test_alert_is_sent_once_when_window_opens(self):
+        self.detector.check_alerts(self._tick("buenbit", buy=1000, sell=990))
+        self.detector.check_alerts(self._tick("ripio", buy=1030, sell=1020))
+        self.detector.check_alerts(self._tick("buenbit", buy=1000, sell=990, minutes=1))
+
+        self.assertTrue(self.detector.snapshots["USDT/ARS"].is_arbitrage)
+        self.notifier.send_alert.assert_called_once()
+
+    def test_stale_ticks_are_ignored(self):
+        self.detector.check_alerts(self._tick("ripio", buy=1030, sell=1020))
+        self.detector.check_alerts(self._tick("buenbit", buy=1000, sell=990, minutes=10))
+
+        self.assertNotIn("USDT/ARS", self.detector.snapshots)
+
+
+if __name__ == "__main__":
+    unittest.main()
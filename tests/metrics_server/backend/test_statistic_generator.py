@@ -1,9 +1,14 @@
+import tempfile
 import unittest
-from unittest.mock import MagicMock
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 from sqlalchemy import create_engine
 
 from crypto_tracking.metrics_server.backend.statistics_generator import GetMinMaxValues
+from crypto_tracking.metrics_server.backend.tick_buffer import TickRingBuffer
+from crypto_tracking.metrics_server.backend.values_model import Values
 
 
 class TestStatisticsGenerator(unittest.TestCase):
@@ -25,6 +30,35 @@ class TestStatisticsGenerator(unittest.TestCase):
         # Assert the result
         self.assertEqual(result, (10, 100))
 
+    def test_short_interval_is_read_from_the_tick_buffer(self):
+        with tempfile.TemporaryDirectory() as folder:
+            tick_buffer = TickRingBuffer.create(Path(folder) / "ticks.ring", capacity=8)
+            now = datetime.now()
+            tick_buffer.append_many(
+                Values(timestamp=now - timedelta(hours=hours), source="buenbit", buy=0, sell=sell)
+                for hours, sell in ((30, 900), (2, 995), (1, 1010), (0, 1000))
+            )
+            db_engine_mock = MagicMock()
+            db_engine_mock.connect.return_value.__enter__.return_value.execute.return_value = [(900, 1010)]
+            min_max_getter = GetMinMaxValues(db_engine=db_engine_mock, tick_buffer=tick_buffer, max_buffer_slots=3)
+
+            self.assertEqual(min_max_getter.get_min_max_daily(), (995, 1010))
+            db_engine_mock.connect.assert_not_called()
+
+            with patch.object(tick_buffer, "_read_slot", wraps=tick_buffer._read_slot) as read_slot:
+                # The monthly window is older than the buffer, which only its oldest slot shows
+                self.assertEqual(min_max_getter.get_min_max_monthly(), (900, 1010))
+                self.assertEqual(read_slot.call_count, 1)
+
+                # A daily window spanning more slots than are worth scanning is only bisected
+                read_slot.reset_mock()
+                min_max_getter.max_buffer_slots = 2
+                self.assertEqual(min_max_getter.get_min_max_daily(), (900, 1010))
+                self.assertEqual(read_slot.call_count, 3)
+            tick_buffer.close()
+
+        self.assertEqual(db_engine_mock.connect.call_count, 2)
+
     def tearDown(self):
         self.db_engine.dispose()
 
@@ -0,0 +1,97 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from crypto_tracking.metrics_server.backend.tick_buffer import TickRingBuffer
+from crypto_tracking.metrics_server.backend.values_model import Values
+
+
+class TestTickRingBuffer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "ticks.ring"
+        self.writer = TickRingBuffer.create(self.path, capacity=4)
+        self.reader = TickRingBuffer.open(self.path)
+        self.start = datetime(2024, 8, 15, 12, 0, 0, 123456)
+
+    def _tick(self, minute: int, source: str = "buenbit", pair: str = "USDT/ARS") -> Values:
+        return Values(
+            timestamp=self.start + timedelta(minutes=minute), source=source, buy=1000 + minute, sell=990, pair=pair
+        )
+
+    def test_reader_sees_writer_ticks(self):
+        self.writer.append_many([self._tick(0), self._tick(0, source="ripio"), self._tick(0, pair="DAI/ARS")])
+
+        self.assertEqual(self.reader.latest(pair="USDT/ARS", source="buenbit"), self._tick(0))
+        self.assertEqual(
+            self.reader.latest_by_source(pair="USDT/ARS", sources=["buenbit", "ripio", "belo"]),
+            [self._tick(0, source="ripio"), self._tick(0)],
+        )
+        self.assertIsNone(self.reader.latest(pair="BTC/ARS", source="buenbit"))
+
+    def test_ring_keeps_only_latest_ticks(self):
+        for minute in range(6):
+            self.writer.append(self._tick(minute))
+
+        self.assertEqual(self.reader.latest(pair="USDT/ARS", source="buenbit"), self._tick(5))
+        self.assertEqual(
+            self.reader.sells_since(pair="USDT/ARS", source="buenbit", start=self._tick(3).timestamp), [990] * 3
+        )
+        self.assertIsNone(self.reader.sells_since(pair="USDT/ARS", source="buenbit", start=self.start))
+
+    def test_sells_since_does_not_scan_windows_it_cannot_serve(self):
+        for minute in range(4):
+            self.writer.append(self._tick(minute))
+
+        with patch.object(self.reader, "_read_slot", wraps=self.reader._read_slot) as read_slot:
+            # Older than the oldest slot: answered from that slot alone
+            self.assertIsNone(
+                self.reader.sells_since(pair="USDT/ARS", source="buenbit", start=self.start - timedelta(days=30))
+            )
+            self.assertEqual(read_slot.call_count, 1)
+
+            # Wider than max_slots: answered from the bisection alone
+            read_slot.reset_mock()
+            self.assertIsNone(
+                self.reader.sells_since(pair="USDT/ARS", source="buenbit", start=self._tick(1).timestamp, max_slots=2)
+            )
+            self.assertEqual(read_slot.call_count, 3)
+
+        self.assertEqual(
+            self.reader.sells_since(pair="USDT/ARS", source="buenbit", start=self._tick(2).timestamp, max_slots=2),
+            [990] * 2,
+        )
+
+    def test_latest_only_looks_back_max_age(self):
+        self.writer.append_many([self._tick(0, source="belo"), self._tick(10), self._tick(11, source="ripio")])
+
+        self.assertIsNone(self.reader.latest(pair="USDT/ARS", source="belo"))
+        self.assertEqual(
+            self.reader.latest(pair="USDT/ARS", source="belo", max_age=timedelta(minutes=15)),
+            self._tick(0, source="belo"),
+        )
+        self.assertEqual(
+            self.reader.latest_by_source(pair="USDT/ARS", sources=["buenbit", "ripio", "belo"]),
+            [self._tick(11, source="ripio"), self._tick(10)],
+        )
+
+    def test_slot_being_written_is_skipped(self):
+        self.writer.append(self._tick(0))
+        # Simulate the writer in the middle of writing tick 0 again
+        self.writer._mmap[64:72] = (1).to_bytes(8, "little")
+
+        self.assertIsNone(self.reader.latest(pair="USDT/ARS", source="buenbit"))
+
+    def test_missing_file(self):
+        self.assertIsNone(TickRingBuffer.open(Path(self.temp_dir.name) / "missing.ring"))
+
+    def tearDown(self):
+        self.reader.close()
+        self.writer.close()
+        self.temp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import json
+import tempfile
+import unittest
+from logging import DEBUG, ERROR, INFO, Formatter, LogRecord, getLogger
+from pathlib import Path
+from unittest.mock import patch
+
+from crypto_tracking.logging_config import (
+    RATE_LIMITED,
+    JsonFormatter,
+    LevelRoutingFileHandler,
+    RateLimitFilter,
+    _stop_queue_listener,
+    configure_logger,
+    logger,
+)
+
+
+def _record(msg: str, level: int = INFO, args: tuple = (), extra: dict | None = RATE_LIMITED) -> LogRecord:
+    return getLogger("test").makeRecord("test", level, __file__, 1, msg, args, None, extra=extra)
+
+
+class TestLevelRoutingFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_folder = Path(self.temp_dir.name)
+
+    def test_records_are_written_to_the_file_of_their_level(self):
+        handler = LevelRoutingFileHandler(levels=[ERROR, INFO], project_folder=self.project_folder)
+        handler.setFormatter(Formatter("%(levelname)s %(message)s"))
+        for record in (_record("stored"), _record("failed", level=ERROR), _record("ignored", level=DEBUG)):
+            handler.handle(record)
+        handler.close()
+
+        info_log = next((self.project_folder / "logs" / "INFO").iterdir())
+        error_log = next((self.project_folder / "logs" / "ERROR").iterdir())
+        self.assertEqual(info_log.read_text(encoding="utf-8"), "INFO stored\n")
+        self.assertEqual(error_log.read_text(encoding="utf-8"), "ERROR failed\n")
+        self.assertFalse((self.project_folder / "logs" / "DEBUG").exists())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+class TestJsonFormatter(unittest.TestCase):
+    def test_format(self):
+        log_entry = json.loads(JsonFormatter().format(_record("Stored %s entries", args=(12,))))
+
+        self.assertEqual(log_entry["message"], "Stored 12 entries")
+        self.assertEqual(log_entry["level"], "INFO")
+
+
+class TestConfigureLogger(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.project_folder = Path(self.temp_dir.name)
+
+    def test_json_output_keeps_the_exception(self):
+        configure_logger(project_folder=self.project_folder, enable_log_to_terminal=False, json_output=True)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("Failed to store %s entries", 3)
+        _stop_queue_listener()
+
+        error_log = next((self.project_folder / "logs" / "ERROR").iterdir())
+        log_entry = json.loads(error_log.read_text(encoding="utf-8"))
+        self.assertEqual(log_entry["message"], "Failed to store 3 entries")
+        self.assertIn("ZeroDivisionError", log_entry["exception"])
+
+    def tearDown(self):
+        _stop_queue_listener()
+        logger.handlers.clear()
+        self.temp_dir.cleanup()
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    @patch("crypto_tracking.logging_config.time.monotonic")
+    def test_repeated_messages_are_suppressed(self, monotonic):
+        rate_limit = RateLimitFilter(interval=60)
+
+        monotonic.return_value = 0
+        self.assertTrue(rate_limit.filter(_record("Stored %s entries", args=(1,))))
+        self.assertFalse(rate_limit.filter(_record("Stored %s entries", args=(2,))))
+        self.assertTrue(rate_limit.filter(_record("Other message")))
+        self.assertTrue(rate_limit.filter(_record("Failed", level=ERROR)))
+        self.assertTrue(rate_limit.filter(_record("Failed", level=ERROR)))
+
+        monotonic.return_value = 61
+        record = _record("Stored %s entries", args=(3,))
+        self.assertTrue(rate_limit.filter(record))
+        self.assertEqual(record.getMessage(), "Stored 3 entries (1 similar messages suppressed)")
+
+    def test_unmarked_messages_are_not_suppressed(self):
+        rate_limit = RateLimitFilter(interval=60)
+
+        for gap in range(5):
+            self.assertTrue(rate_limit.filter(_record("Gap in %s", args=(gap,), extra=None)))
+
+
+if __name__ == "__main__":
+    unittest.main()